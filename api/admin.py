@@ -1,23 +1,132 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth import get_user_model
-from .models import Kandidat, Vote
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+from .models import BallotCode, HasilFinal, Kandidat, Vote
 
 User = get_user_model()
 
+
+# ========================
+# Helper untuk tabel besar (100k+ peserta / vote)
+# ========================
+
+def _estimasi_baris(queryset):
+    """
+    Perkiraan jumlah baris tabel tanpa scan: statistik planner PostgreSQL
+    (reltuples), selain itu MAX(pk) (id auto increment, lewat index).
+    None kalau statistik belum ada.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                           [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        return row[0] if row and row[0] > 0 else None
+    return queryset.aggregate(m=Max('pk'))['m']
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator changelist tanpa COUNT(*) penuh. Tanpa filter/pencarian: estimasi
+    (_estimasi_baris), halaman terakhir bisa sedikit meleset. Dengan filter:
+    hitung maksimal ADMIN_COUNT_MAKS baris; lebih dari itu, persempit dengan filter.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        batas = settings.ADMIN_COUNT_MAKS
+        if not queryset.query.where:
+            estimasi = _estimasi_baris(queryset)
+            if estimasi is not None and estimasi > batas:
+                return estimasi
+        # COUNT(*) atas subquery LIMIT: berhenti setelah `batas` baris
+        return queryset[:batas].count()
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # "x dari total y": tanpa query COUNT(*) kedua atas seluruh tabel
+    show_full_result_count = False
+
+
+class AdminOwnerFilter(admin.SimpleListFilter):
+    """
+    Filter per admin aplikasi tanpa memuat semua user ke sidebar: hanya
+    ADMIN_FILTER_MAKS admin pertama (urut username) + admin yang sedang dipilih.
+    Admin lain lewat URL ?admin=<id>.
+    """
+    title = 'admin'
+    parameter_name = 'admin'
+    field = 'admin_owner'
+
+    def lookups(self, request, model_admin):
+        pilihan = list(User.objects.filter(is_app_admin=True).order_by('username')
+                           .values_list('id', 'username')[:settings.ADMIN_FILTER_MAKS])
+        terpilih = self.value()
+        if terpilih and terpilih.isdigit() and int(terpilih) not in {pk for pk, _ in pilihan}:
+            pilihan += User.objects.filter(pk=terpilih).values_list('id', 'username')
+        return [(str(pk), username) for pk, username in pilihan]
+
+    def queryset(self, request, queryset):
+        terpilih = self.value()
+        if terpilih and terpilih.isdigit():
+            return queryset.filter(**{f'{self.field}_id': terpilih})
+        return queryset
+
+
+class KandidatAdminOwnerFilter(AdminOwnerFilter):
+    field = 'kandidat__admin_owner'
+
+
+# ========================
+# Registrasi model
+# ========================
+
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(LargeTableAdmin):
     list_display = ('id', 'username', 'is_app_admin', 'is_participant', 'admin_owner', 'must_change_password')
-    list_filter = ('is_app_admin', 'is_participant')
+    list_filter = ('is_app_admin', 'is_participant', AdminOwnerFilter)
+    list_select_related = ('admin_owner',)
     search_fields = ('username',)
+    autocomplete_fields = ('admin_owner',)
 
 @admin.register(Kandidat)
-class KandidatAdmin(admin.ModelAdmin):
+class KandidatAdmin(LargeTableAdmin):
     list_display = ('id', 'nama', 'admin_owner', 'created_at')
-    list_filter = ('admin_owner',)
+    list_filter = (AdminOwnerFilter,)
+    list_select_related = ('admin_owner',)
     search_fields = ('nama',)
+    autocomplete_fields = ('admin_owner',)
 
 @admin.register(Vote)
-class VoteAdmin(admin.ModelAdmin):
+class VoteAdmin(LargeTableAdmin):
     list_display = ('id', 'voter', 'kandidat', 'created_at')
-    list_filter = ('kandidat__admin_owner',)
-    search_fields = ('voter__username', 'kandidat__nama')
+    list_filter = (KandidatAdminOwnerFilter,)
+    # str(kandidat) ikut menampilkan username admin-nya
+    list_select_related = ('voter', 'kandidat__admin_owner')
+    # awalan username, bukan LIKE '%...%' atas join 100k baris
+    search_fields = ('^voter__username', 'kandidat__nama')
+    autocomplete_fields = ('voter', 'kandidat')
+
+
+@admin.register(BallotCode)
+class BallotCodeAdmin(LargeTableAdmin):
+    list_display = ('id', 'peserta', 'created_at', 'used_at')
+    list_select_related = ('peserta',)
+    search_fields = ('^peserta__username',)
+    autocomplete_fields = ('peserta',)
+    readonly_fields = ('digest',)
+
+
+@admin.register(HasilFinal)
+class HasilFinalAdmin(admin.ModelAdmin):
+    list_display = ('id', 'admin', 'ditutup_at')
+    list_select_related = ('admin',)
+    readonly_fields = ('admin', 'ditutup_at', 'hasil', 'kandidat')
@@ -0,0 +1,182 @@
+"""
+Admission control: token bucket per route & per principal (peserta / admin /
+anonim per IP), dijalankan di middleware SEBELUM view menyentuh database.
+Request yang melebihi jatah langsung dijawab 429 + Retry-After.
+
+Selain bucket per principal ada satu bucket global per proses (kapasitas DB
+worker ini). Route prioritas (vote) boleh menghabiskan bucket global; route
+lain ditolak lebih dulu begitu isinya turun di bawah cadangan, jadi saat
+lonjakan pembukaan voting yang dikorbankan adalah pembaca hasil, bukan pemilih.
+"""
+import ipaddress
+import math
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .cache import LRUCache
+
+
+class TokenBucket:
+    """
+    Kumpulan token bucket in-process, satu per key. State disimpan di LRUCache
+    (ukuran terbatas); key yang lama tidak dipakai hilang = bucket penuh lagi.
+    """
+
+    def __init__(self, maxsize=100_000, ttl=600):
+        self._state = LRUCache(maxsize, ttl)
+        self._lock = threading.Lock()
+
+    def ambil(self, key, kapasitas, laju, cadangan=0.0):
+        """
+        Ambil satu token. Return 0 kalau diizinkan, selain itu detik sampai
+        token tersedia. `cadangan`: sisa token minimal yang tidak boleh dipakai request ini.
+        """
+        sekarang = time.monotonic()
+        with self._lock:
+            isi, terakhir = self._state.get(key, (kapasitas, sekarang))
+            isi = min(kapasitas, isi + (sekarang - terakhir) * laju)
+            if isi - 1 < cadangan:
+                self._state.set(key, (isi, sekarang))
+                return (cadangan + 1 - isi) / laju
+            self._state.set(key, (isi - 1, sekarang))
+            return 0
+
+    def clear(self):
+        self._state.clear()
+
+
+class JendelaBersama:
+    """
+    Varian untuk cache bersama (Redis) antar worker: jendela tetap selebar
+    kapasitas/laju detik dengan counter atomik (add + incr), pendekatan token
+    bucket yang tidak butuh read-modify-write.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def ambil(self, key, kapasitas, laju, cadangan=0.0):
+        cache = caches[self.alias]
+        lebar = max(1, math.ceil(kapasitas / laju))
+        jendela = int(time.time() // lebar)
+        cache_key = f'admission:{key}:{jendela}'
+        cache.add(cache_key, 0, timeout=lebar + 1)
+        try:
+            jumlah = cache.incr(cache_key)
+        except ValueError:
+            # key kedaluwarsa di antara add dan incr
+            return 0
+        if jumlah > kapasitas - cadangan:
+            return (jendela + 1) * lebar - time.time()
+        return 0
+
+
+@lru_cache(maxsize=8)
+def _jaringan_proxy(daftar):
+    return tuple(ipaddress.ip_network(x, strict=False) for x in daftar)
+
+
+def _proxy_tepercaya(alamat):
+    try:
+        ip = ipaddress.ip_address(alamat)
+    except ValueError:
+        return False
+    return any(ip in jaringan for jaringan in _jaringan_proxy(tuple(settings.ADMISSION_TRUSTED_PROXIES)))
+
+
+def alamat_klien(request):
+    """
+    IP pemohon untuk bucket anon. Di belakang reverse proxy / load balancer
+    (REMOTE_ADDR ada di ADMISSION_TRUSTED_PROXIES), ambil dari X-Forwarded-For:
+    alamat paling kanan yang bukan proxy tepercaya, karena bagian kiri header
+    bisa diisi sendiri oleh klien.
+    """
+    alamat = request.META.get('REMOTE_ADDR', '')
+    if not _proxy_tepercaya(alamat):
+        return alamat
+    diteruskan = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    for hop in reversed([x.strip() for x in diteruskan.split(',') if x.strip()]):
+        if not _proxy_tepercaya(hop):
+            return hop
+        alamat = hop
+    return alamat
+
+
+def token_akses(request):
+    """
+    AccessToken dari header Authorization (hanya cek tanda tangan & kedaluwarsa,
+    tanpa query DB), None kalau tidak ada / tidak valid.
+    """
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not header.startswith('Bearer '):
+        return None
+    try:
+        return AccessToken(header[7:])
+    except TokenError:
+        return None
+
+
+def principal(request):
+    """
+    (jenis, id) pemohon dari klaim JWT tanpa query DB: ('peserta', user_id),
+    ('admin', user_id), atau ('anon', IP) kalau tanpa token / token tidak valid
+    (IP dari alamat_klien).
+    """
+    token = token_akses(request)
+    if token is None:
+        return 'anon', alamat_klien(request)
+    if token.get('is_app_admin'):
+        return 'admin', token.get('user_id')
+    return 'peserta', token.get('user_id')
+
+
+class AdmissionMiddleware:
+    """
+    Tolak request /api/ yang melebihi ADMISSION_RATE_LIMITS / ADMISSION_GLOBAL
+    dengan 429 sebelum view jalan. Dilepas saat startup kalau ADMISSION_ENABLED=False.
+    """
+
+    def __init__(self, get_response):
+        if not settings.ADMISSION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.lokal = TokenBucket(maxsize=settings.ADMISSION_MAX_KEYS)
+        alias = settings.ADMISSION_CACHE_ALIAS
+        self.bersama = JendelaBersama(alias) if alias else self.lokal
+
+    def __call__(self, request):
+        tunggu = self.cek(request)
+        if tunggu:
+            response = JsonResponse({"error": "Server sedang sibuk, coba lagi sebentar."}, status=429)
+            response['Retry-After'] = str(max(1, math.ceil(tunggu)))
+            return response
+        return self.get_response(request)
+
+    def cek(self, request):
+        if not request.path_info.startswith('/api/'):
+            return 0
+        try:
+            route = resolve(request.path_info).url_name
+        except Resolver404:
+            return 0
+
+        jenis, ident = principal(request)
+        aturan = settings.ADMISSION_RATE_LIMITS
+        batas = aturan.get(route, {}).get(jenis) or aturan.get('*', {}).get(jenis)
+        if batas:
+            tunggu = self.bersama.ambil(f'{route}:{jenis}:{ident}', *batas)
+            if tunggu:
+                return tunggu
+
+        kapasitas, laju = settings.ADMISSION_GLOBAL
+        cadangan = 0 if route in settings.ADMISSION_PRIORITAS else kapasitas * settings.ADMISSION_CADANGAN
+        return self.lokal.ambil('global', kapasitas, laju, cadangan)
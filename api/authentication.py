@@ -0,0 +1,90 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import versi_token
+
+# Klaim yang ditanam di JWT saat login (lihat VotingTokenObtainPairSerializer)
+KLAIM_USER = ('username', 'is_app_admin', 'is_participant', 'admin_owner_id', 'must_change_password')
+
+
+def klaim_untuk(user):
+    klaim = {nama: getattr(user, nama) for nama in KLAIM_USER}
+    klaim['tv'] = user.token_version
+    return klaim
+
+
+def cek_versi_token(validated_token, versi):
+    if validated_token.get('tv', 0) != versi:
+        raise AuthenticationFailed("Token sudah tidak berlaku, silakan login ulang.", code='token_revoked')
+
+
+class VersionedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication biasa (User dibaca dari DB) + cek klaim "tv" terhadap
+    User.token_version, supaya token lama mati setelah ganti password.
+    Token login kode ballot (scope "vote") ditolak di sini.
+    """
+    izinkan_scope_vote = False
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if token.get('scope') == 'vote' and not self.izinkan_scope_vote:
+            raise AuthenticationFailed("Token kode ballot hanya berlaku untuk vote dan melihat hasil.",
+                                       code='token_scope')
+        return token
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        cek_versi_token(validated_token, user.token_version)
+        return user
+
+
+class ClaimsUser(TokenUser):
+    """
+    User dari klaim JWT, tanpa baris User dari DB. Cukup untuk IsAppAdmin /
+    IsParticipant dan view baca yang hanya butuh id, role dan admin_owner_id.
+    """
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def is_app_admin(self):
+        return bool(self.token.get('is_app_admin'))
+
+    @cached_property
+    def is_participant(self):
+        return bool(self.token.get('is_participant'))
+
+    @cached_property
+    def admin_owner_id(self):
+        return self.token.get('admin_owner_id')
+
+    @cached_property
+    def must_change_password(self):
+        return bool(self.token.get('must_change_password'))
+
+
+class ClaimsJWTAuthentication(VersionedJWTAuthentication):
+    """
+    Untuk jalur baca (hasil, daftar kandidat, me): user dibangun dari klaim token
+    tanpa query User. Pembatalan token dicek lewat versi token di cache.
+    Token lama tanpa klaim role jatuh ke VersionedJWTAuthentication (query DB).
+    Dipakai juga oleh `vote`, satu-satunya jalur tulis yang menerima token kode ballot.
+    """
+    izinkan_scope_vote = True
+
+    def get_user(self, validated_token):
+        if 'is_app_admin' not in validated_token:
+            return super().get_user(validated_token)
+        user = ClaimsUser(validated_token)
+        cek_versi_token(validated_token, versi_token(user.id))
+        return user
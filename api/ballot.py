@@ -0,0 +1,178 @@
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.dateparse import parse_datetime
+
+from . import tally, turnout
+from .hasil import VotingDitutup, cek_voting_dibuka, hasil_berubah
+from .models import Kandidat, Vote
+from .penulis import tulis
+
+# 15 byte acak = 120 bit entropi -> 24 karakter base32, ditampilkan per 4 karakter
+PANJANG_KODE_BYTES = 15
+
+
+def buat_kode():
+    raw = base64.b32encode(secrets.token_bytes(PANJANG_KODE_BYTES)).decode()
+    return '-'.join(raw[i:i + 4] for i in range(0, len(raw), 4))
+
+
+def normalisasi(kode):
+    return ''.join(kode.split()).replace('-', '').upper()
+
+
+def digest_kode(kode):
+    """
+    HMAC-SHA256 kode yang sudah dinormalisasi. Kode berentropi tinggi tidak butuh
+    hasher lambat seperti PBKDF2, cukup HMAC berkunci lalu lookup unik di DB.
+    """
+    return salted_hmac('api.ballot.kode', normalisasi(kode), secret=settings.BALLOT_CODE_SECRET,
+                       algorithm='sha256').hexdigest()
+
+
+# ========================
+# Upload batch dari kiosk offline
+# ========================
+
+def kunci_kiosk(admin_id):
+    """
+    Kunci HMAC kiosk milik satu admin, diturunkan dari BALLOT_BATCH_SECRET
+    (terpisah dari SECRET_KEY). Kunci yang bocor dari kiosk satu admin tidak bisa
+    menandatangani batch admin lain, apalagi token/session. Dibagikan lewat
+    `manage.py kunci_kiosk USERNAME`.
+    """
+    rahasia = settings.BALLOT_BATCH_SECRET
+    if not rahasia:
+        raise ImproperlyConfigured("BALLOT_BATCH_SECRET belum di-set; upload batch kiosk dimatikan.")
+    return hmac.new(rahasia.encode(), f"kiosk:{admin_id}".encode(), hashlib.sha256).hexdigest()
+
+
+def tanda_tangan_batch(admin_id, ballots):
+    """
+    HMAC-SHA256 (hex) dengan kunci_kiosk(admin_id) atas JSON kanonik daftar
+    ballot (sort_keys, tanpa spasi, UTF-8). Kiosk menghitung hal yang sama sebelum sync.
+    """
+    kanonik = json.dumps(ballots, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hmac.new(kunci_kiosk(admin_id).encode(), kanonik.encode(), hashlib.sha256).hexdigest()
+
+
+def tanda_tangan_valid(admin_id, ballots, signature):
+    return constant_time_compare(tanda_tangan_batch(admin_id, ballots), signature)
+
+
+def _parse_ballot(ballot, batas_waktu):
+    """
+    (username, kandidat_id, waktu) dari satu ballot, atau alasan tolak (str).
+    """
+    if not isinstance(ballot, dict):
+        return 'format_tidak_valid'
+    username, kandidat_id, waktu = ballot.get('peserta'), ballot.get('kandidat_id'), ballot.get('waktu')
+    if not isinstance(username, str) or not username or type(kandidat_id) is not int:
+        return 'format_tidak_valid'
+    try:
+        waktu = parse_datetime(waktu) if isinstance(waktu, str) else None
+    except ValueError:
+        waktu = None
+    if waktu is None:
+        return 'waktu_tidak_valid'
+    if timezone.is_naive(waktu):
+        waktu = timezone.make_aware(waktu)
+    if waktu > batas_waktu:
+        return 'waktu_tidak_valid'
+    return username, kandidat_id, waktu
+
+
+def unggah_batch(admin, ballots):
+    """
+    Vote dari kiosk offline: [{"peserta": username, "kandidat_id", "waktu": ISO 8601}, ...].
+    Validasi set-wise (beberapa query IN untuk seluruh batch, bukan 3 query per
+    ballot), lalu insert per BALLOT_BATCH_CHUNK dengan bulk_create. Return hasil
+    per ballot, urutan sama dengan input.
+    """
+    User = get_user_model()
+    chunk = settings.BALLOT_BATCH_CHUNK
+    batas_waktu = timezone.now() + settings.BALLOT_BATCH_SKEW
+    alasan = {}  # index -> alasan tolak; index yang tidak ada di sini = diterima
+    calon = {}   # username -> (index, kandidat_id, waktu)
+    for i, ballot in enumerate(ballots):
+        parsed = _parse_ballot(ballot, batas_waktu)
+        if isinstance(parsed, str):
+            alasan[i] = parsed
+        elif parsed[0] in calon:
+            alasan[i] = 'duplikat_dalam_batch'
+        else:
+            calon[parsed[0]] = (i, *parsed[1:])
+
+    kandidat_admin = set(Kandidat.objects.filter(admin_owner=admin).values_list('id', flat=True))
+    usernames = list(calon)
+    peserta = {}
+    for j in range(0, len(usernames), chunk):
+        peserta.update(User.objects.filter(admin_owner=admin, is_participant=True, username__in=usernames[j:j + chunk])
+                       .values_list('username', 'id'))
+    ids = list(peserta.values())
+    sudah = set()
+    for j in range(0, len(ids), chunk):
+        sudah.update(Vote.objects.filter(voter_id__in=ids[j:j + chunk]).values_list('voter_id', flat=True))
+
+    votes = []  # (index, Vote)
+    for username, (i, kandidat_id, waktu) in calon.items():
+        voter_id = peserta.get(username)
+        if voter_id is None:
+            alasan[i] = 'peserta_tidak_dikenal'
+        elif kandidat_id not in kandidat_admin:
+            alasan[i] = 'kandidat_tidak_dikenal'
+        elif voter_id in sudah:
+            alasan[i] = 'sudah_vote'
+        else:
+            votes.append((i, Vote(voter_id=voter_id, kandidat_id=kandidat_id, created_at=waktu)))
+
+    for j in range(0, len(votes), chunk):
+        bagian = votes[j:j + chunk]
+        try:
+            masuk = tulis(_simpan_batch_vote, admin.id, [v for _, v in bagian])
+        except VotingDitutup:
+            for i, _ in votes[j:]:
+                alasan[i] = 'voting_ditutup'
+            break
+        for i, v in bagian:
+            if v.voter_id not in masuk:
+                alasan[i] = 'sudah_vote'
+
+    return [{"index": i, "status": "rejected", "reason": alasan[i]} if i in alasan
+            else {"index": i, "status": "accepted"} for i in range(len(ballots))]
+
+
+def _simpan_batch_vote(admin_id, votes):
+    """
+    Satu chunk dalam satu transaksi: insert, tally per (kandidat, shard), rollup
+    turnout per menit, cek voting belum ditutup (lihat cek_voting_dibuka).
+    Peserta yang keburu vote online di antara validasi dan insert dibuang, lalu chunk diulang.
+    Return set voter_id yang masuk.
+    """
+    while votes:
+        try:
+            with transaction.atomic():
+                Vote.objects.bulk_create(votes)
+                tally.tambah_banyak((v.kandidat_id, v.voter_id) for v in votes)
+                turnout.tambah_vote_banyak(admin_id, ((v.voter_id, v.created_at) for v in votes))
+                cek_voting_dibuka(admin_id)
+        except IntegrityError:
+            sudah = set(Vote.objects.filter(voter_id__in=[v.voter_id for v in votes])
+                        .values_list('voter_id', flat=True))
+            if not sudah:
+                raise
+            votes = [v for v in votes if v.voter_id not in sudah]
+            continue
+        # bulk_create tidak mengirim post_save: versi hasil & viewer live dikabari di sini
+        hasil_berubah(admin_id)
+        return {v.voter_id for v in votes}
+    return set()
@@ -0,0 +1,258 @@
+"""
+Benchmark beban hari-H pemilihan: seed data, lalu simulasikan login storm,
+burst vote dan viewer hasil secara bersamaan. Dijalankan lewat
+`python manage.py bench` (lihat api/management/commands/bench.py).
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..ballot import buat_kode, digest_kode
+from ..models import BallotCode, Kandidat
+from ..serializers import token_baru
+
+User = get_user_model()
+
+SKENARIO = {}
+
+
+def skenario(nama):
+    """
+    Daftarkan fungsi skenario: fungsi(konteks) -> list[Permintaan].
+    """
+    def daftar(fungsi):
+        SKENARIO[nama] = fungsi
+        return fungsi
+    return daftar
+
+
+@dataclass
+class Permintaan:
+    endpoint: str
+    method: str
+    path: str
+    data: dict = None
+    token: str = None
+
+
+@dataclass
+class Konteks:
+    password: str
+    admins: list = field(default_factory=list)       # [username]
+    kandidat: dict = field(default_factory=dict)     # admin username -> [kandidat id]
+    peserta: list = field(default_factory=list)      # [(User, admin username)]
+    _tokens: dict = field(default_factory=dict)
+
+    def token(self, user):
+        if user.pk not in self._tokens:
+            self._tokens[user.pk] = token_baru(user)['access']
+        return self._tokens[user.pk]
+
+
+def seed(admins, kandidat, peserta, password='Bench-Pass-2024'):
+    """
+    Buat `admins` admin, masing-masing `kandidat` kandidat dan `peserta` peserta.
+    Hash password dihitung sekali lalu dipakai ulang supaya seeding tetap cepat.
+    """
+    hashed = make_password(password)
+    ktx = Konteks(password=password)
+    for a in range(admins):
+        admin = User.objects.create(username=f'bench-admin{a}', password=hashed, is_app_admin=True)
+        ktx.admins.append(admin.username)
+        objs = Kandidat.objects.bulk_create(
+            [Kandidat(admin_owner=admin, nama=f'Kandidat {k}') for k in range(kandidat)]
+        )
+        ktx.kandidat[admin.username] = [k.id for k in objs]
+        users = User.objects.bulk_create([
+            User(username=f'bench-a{a}-p{p}', password=hashed, is_participant=True,
+                 admin_owner=admin, must_change_password=True)
+            for p in range(peserta)
+        ], batch_size=1000)
+        ktx.peserta += [(u, admin.username) for u in users]
+    return ktx
+
+
+# ========================
+# Skenario bawaan
+# ========================
+
+@skenario('login')
+def skenario_login(ktx):
+    return [Permintaan('token', 'post', '/api/token/', {'username': u.username, 'password': ktx.password})
+            for u, _ in ktx.peserta]
+
+
+@skenario('login_ballot')
+def skenario_login_ballot(ktx):
+    """
+    Login kode ballot (HMAC + lookup) untuk dibandingkan dengan skenario `login` (PBKDF2).
+    """
+    BallotCode.objects.filter(peserta__in=[u for u, _ in ktx.peserta]).delete()
+    kode = {u.pk: buat_kode() for u, _ in ktx.peserta}
+    BallotCode.objects.bulk_create([BallotCode(peserta=u, digest=digest_kode(kode[u.pk])) for u, _ in ktx.peserta],
+                                   batch_size=1000)
+    return [Permintaan('token_ballot', 'post', '/api/token/ballot/', {'code': kode[u.pk]}) for u, _ in ktx.peserta]
+
+
+@skenario('vote')
+def skenario_vote(ktx):
+    return [Permintaan('vote', 'post', '/api/vote/', {'kandidat_id': random.choice(ktx.kandidat[admin])},
+                       token=ktx.token(u))
+            for u, admin in ktx.peserta]
+
+
+@skenario('hasil')
+def skenario_hasil(ktx):
+    hasil = []
+    for u, admin in ktx.peserta:
+        hasil.append(Permintaan('hasil', 'get', '/api/hasil/', {'admin': admin}))
+        hasil.append(Permintaan('hasil', 'get', '/api/hasil/', token=ktx.token(u)))
+    return hasil
+
+
+@skenario('kandidat')
+def skenario_kandidat(ktx):
+    return [Permintaan('kandidat', 'get', '/api/kandidat/', {'admin': admin}) for _, admin in ktx.peserta]
+
+
+@skenario('vote_hasil')
+def skenario_vote_hasil(ktx):
+    """
+    Vote dan viewer hasil bersamaan (pembukaan voting): penulis dan pembaca berebut DB.
+    """
+    permintaan = skenario_vote(ktx) + skenario_hasil(ktx)
+    random.shuffle(permintaan)
+    return permintaan
+
+
+# ========================
+# Runner & statistik
+# ========================
+
+class PembungkusDB:
+    """
+    execute_wrapper untuk semua koneksi (termasuk yang dibuat thread baru):
+    menambah latency buatan per query, meniru jarak jaringan ke server database.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.latency:
+            time.sleep(self.latency)
+        return execute(sql, params, many, context)
+
+    def _pasang(self, connection, **kwargs):
+        connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        connection_created.connect(self._pasang)
+        for conn in connections.all():
+            conn.execute_wrappers.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        connection_created.disconnect(self._pasang)
+        for conn in connections.all():
+            if self in conn.execute_wrappers:
+                conn.execute_wrappers.remove(self)
+
+
+def persentil(data, p):
+    if not data:
+        return 0.0
+    data = sorted(data)
+    idx = min(len(data) - 1, max(0, round(p / 100 * len(data)) - 1))
+    return data[idx]
+
+
+def jalankan(permintaan, concurrency):
+    """
+    Jalankan semua permintaan dengan `concurrency` thread (satu koneksi DB per thread).
+    Return {endpoint: {"latency": [...detik], "queries": [...], "errors": n, "durasi": detik}}.
+    """
+    lokal = threading.local()
+    lock = threading.Lock()
+    hasil = {}
+
+    def kirim(req):
+        client = getattr(lokal, 'client', None)
+        if client is None:
+            client = lokal.client = APIClient()
+        kwargs = {'HTTP_AUTHORIZATION': f'Bearer {req.token}'} if req.token else {}
+        with CaptureQueriesContext(connection) as q:
+            mulai = time.perf_counter()
+            try:
+                if req.method == 'get':
+                    res = client.get(req.path, req.data, **kwargs)
+                else:
+                    res = client.post(req.path, req.data, format='json', **kwargs)
+                gagal = res.status_code >= 400
+            except Exception:
+                gagal = True
+            durasi = time.perf_counter() - mulai
+        with lock:
+            stat = hasil.setdefault(req.endpoint, {'latency': [], 'queries': [], 'errors': 0})
+            stat['latency'].append(durasi)
+            stat['queries'].append(len(q.captured_queries))
+            stat['errors'] += int(gagal)
+
+    def tutup_koneksi(_):
+        connection.close()
+
+    mulai = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(kirim, permintaan))
+        list(pool.map(tutup_koneksi, range(concurrency)))
+    total = time.perf_counter() - mulai
+    for stat in hasil.values():
+        stat['durasi'] = total
+    return hasil
+
+
+def ringkas(hasil):
+    """
+    Statistik per endpoint: p50/p95/p99 (ms), requests/detik, rata-rata query per request.
+    """
+    ringkasan = {}
+    for endpoint, stat in sorted(hasil.items()):
+        n = len(stat['latency'])
+        ringkasan[endpoint] = {
+            'requests': n,
+            'errors': stat['errors'],
+            'p50_ms': round(persentil(stat['latency'], 50) * 1000, 2),
+            'p95_ms': round(persentil(stat['latency'], 95) * 1000, 2),
+            'p99_ms': round(persentil(stat['latency'], 99) * 1000, 2),
+            'rps': round(n / stat['durasi'], 1) if stat['durasi'] else 0.0,
+            'queries': round(sum(stat['queries']) / n, 2) if n else 0.0,
+        }
+    return ringkasan
+
+
+def bandingkan(ringkasan, baseline, toleransi):
+    """
+    Daftar regresi terhadap baseline: p95 lebih lambat / rps lebih rendah dari
+    toleransi (mis. 0.2 = 20%), atau query per request bertambah.
+    """
+    regresi = []
+    for endpoint, lama in baseline.items():
+        baru = ringkasan.get(endpoint)
+        if baru is None:
+            continue
+        if baru['p95_ms'] > lama['p95_ms'] * (1 + toleransi):
+            regresi.append(f"{endpoint}: p95 {baru['p95_ms']}ms > baseline {lama['p95_ms']}ms")
+        if baru['rps'] < lama['rps'] * (1 - toleransi):
+            regresi.append(f"{endpoint}: rps {baru['rps']} < baseline {lama['rps']}")
+        if baru['queries'] > lama['queries']:
+            regresi.append(f"{endpoint}: queries/request {baru['queries']} > baseline {lama['queries']}")
+    return regresi
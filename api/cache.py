@@ -0,0 +1,248 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+
+def _cache():
+    return caches[settings.HASIL_CACHE_ALIAS]
+
+
+def _key_versi(admin_id):
+    return f"hasil:versi:{admin_id}"
+
+
+# ========================
+# Versi hasil per admin
+# ========================
+
+def versi_hasil(admin_id):
+    """
+    Token versi hasil/kandidat milik admin. Berubah setiap ada Vote/Kandidat
+    admin ini yang berubah (lihat api/signals.py). Token acak, bukan counter,
+    supaya versi yang hilang dari cache tidak pernah menghasilkan ETag lama lagi.
+    """
+    cache = _cache()
+    key = _key_versi(admin_id)
+    versi = cache.get(key)
+    if versi is None:
+        cache.add(key, uuid.uuid4().hex[:12], settings.HASIL_CACHE_TIMEOUT)
+        versi = cache.get(key)
+    return versi
+
+
+def naikkan_versi(admin_id):
+    _cache().set(_key_versi(admin_id), uuid.uuid4().hex[:12], settings.HASIL_CACHE_TIMEOUT)
+
+
+def ambil_versioned(nama, admin_id, versi, url, hitung, timeout=None):
+    """
+    Ambil body response dari cache untuk (admin, versi, url); hitung() hanya
+    dipanggil kalau belum ada. Versi baru = key baru, jadi tidak perlu hapus manual.
+    `timeout` lebih pendek untuk body yang dihitung dari replica (bisa tertinggal dari versinya).
+    """
+    cache = _cache()
+    digest = hashlib.md5(url.encode()).hexdigest()
+    key = f"hasil:{nama}:{admin_id}:{versi}:{digest}"
+    data = cache.get(key)
+    if data is None:
+        data = hitung()
+        cache.set(key, data, settings.HASIL_CACHE_TIMEOUT if timeout is None else timeout)
+    return data
+
+
+# ========================
+# Versi token JWT per user
+# ========================
+
+def _key_versi_token(user_id):
+    return f"token:versi:{user_id}"
+
+
+def versi_token(user_id):
+    """
+    token_version user (read-through cache). -1 kalau user sudah dihapus atau
+    nonaktif, sehingga tidak ada klaim "tv" yang cocok.
+    """
+    cache = _cache()
+    key = _key_versi_token(user_id)
+    versi = cache.get(key)
+    if versi is None:
+        User = get_user_model()
+        versi = (User.objects.filter(pk=user_id, is_active=True)
+                     .values_list('token_version', flat=True).first())
+        if versi is None:
+            versi = -1
+        cache.set(key, versi, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return versi
+
+
+def lupakan_versi_token(user_id):
+    _cache().delete(_key_versi_token(user_id))
+
+
+# ========================
+# Katalog kandidat & username admin
+# ========================
+
+class LRUCache:
+    """
+    Cache in-process berukuran terbatas (least recently used) dengan TTL per entri.
+    TTL membatasi umur data di worker lain yang tidak ikut menerima signal invalidasi.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            nilai, kedaluwarsa = item
+            if kedaluwarsa < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return nilai
+
+    def set(self, key, nilai):
+        with self._lock:
+            self._data[key] = (nilai, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class KatalogCache:
+    """
+    Dua tingkat: LRU in-process (L1) lalu cache Django bersama (L2, alias
+    KATALOG_CACHE_ALIAS; None = hanya L1). Dipakai untuk username admin -> id
+    dan katalog kandidat per admin.
+    """
+    TIDAK_ADA = -1  # negative cache untuk username yang bukan admin
+
+    def __init__(self):
+        self._lru = None
+
+    @property
+    def lru(self):
+        if self._lru is None:
+            self._lru = LRUCache(settings.KATALOG_LRU_SIZE, settings.KATALOG_LRU_TTL)
+        return self._lru
+
+    def _shared(self):
+        alias = settings.KATALOG_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def get(self, key):
+        nilai = self.lru.get(key)
+        if nilai is None and (shared := self._shared()) is not None:
+            nilai = shared.get(key)
+            if nilai is not None:
+                self.lru.set(key, nilai)
+        return nilai
+
+    def set(self, key, nilai):
+        self.lru.set(key, nilai)
+        if (shared := self._shared()) is not None:
+            shared.set(key, nilai, settings.KATALOG_CACHE_TIMEOUT)
+
+    def delete(self, key):
+        self.lru.delete(key)
+        if (shared := self._shared()) is not None:
+            shared.delete(key)
+
+    def generasi_admin(self):
+        # Namespace username admin; dinaikkan kalau ada admin berubah (ganti username dll.)
+        shared = self._shared()
+        return shared.get_or_set('katalog:admin:gen', 0, None) if shared is not None else 0
+
+    def reset_admin(self):
+        self.lru.clear()
+        if (shared := self._shared()) is not None:
+            try:
+                shared.incr('katalog:admin:gen')
+            except ValueError:
+                shared.set('katalog:admin:gen', 1, None)
+
+
+katalog_cache = KatalogCache()
+
+
+def admin_id_untuk(username):
+    """
+    Id admin dari username (untuk akses publik ?admin=USERNAME), None kalau bukan admin.
+    Dari primary, bukan replica: hasil negatif di-cache, admin baru jangan tertahan 404.
+    """
+    key = f"katalog:admin:{katalog_cache.generasi_admin()}:{username}"
+    admin_id = katalog_cache.get(key)
+    if admin_id is None:
+        User = get_user_model()
+        admin_id = (User.objects.using('default').filter(username=username, is_app_admin=True)
+                        .values_list('id', flat=True).first()) or KatalogCache.TIDAK_ADA
+        katalog_cache.set(key, admin_id)
+    return None if admin_id == KatalogCache.TIDAK_ADA else admin_id
+
+
+def _key_katalog(admin_id):
+    return f"katalog:kandidat:{admin_id}"
+
+
+def katalog_kandidat(admin_id, serialize):
+    """
+    Katalog kandidat admin yang sudah diserialisasi (termasuk visi/misi panjang),
+    urut terbaru dulu. `serialize()` hanya dipanggil saat cache kosong; total
+    suara TIDAK ikut di-cache di sini karena berubah tiap vote.
+    """
+    key = _key_katalog(admin_id)
+    data = katalog_cache.get(key)
+    if data is None:
+        data = serialize()
+        katalog_cache.set(key, data)
+    return data
+
+
+def lupakan_katalog(admin_id):
+    katalog_cache.delete(_key_katalog(admin_id))
+
+
+def _key_final(admin_id):
+    return f"katalog:final:{admin_id}"
+
+
+def hasil_final_cache(admin_id, ambil):
+    """
+    Snapshot final admin (dict) atau None kalau voting masih dibuka. Snapshot
+    tidak pernah berubah, jadi aman di-cache; status "masih dibuka" dilupakan
+    saat voting ditutup (lupakan_final).
+    """
+    key = _key_final(admin_id)
+    data = katalog_cache.get(key)
+    if data is None:
+        data = ambil() or KatalogCache.TIDAK_ADA
+        katalog_cache.set(key, data)
+    return None if data == KatalogCache.TIDAK_ADA else data
+
+
+def lupakan_final(admin_id):
+    katalog_cache.delete(_key_final(admin_id))
@@ -0,0 +1,113 @@
+from django.db import transaction
+from rest_framework import serializers
+
+from .cache import hasil_final_cache, katalog_kandidat, lupakan_katalog, naikkan_versi
+from .models import HasilFinal, Kandidat
+from .serializers import KandidatListSerializer
+from .tally import total_per_kandidat, total_votes
+
+KATALOG_FIELDS = [f for f in KandidatListSerializer.Meta.fields if f != 'total_votes']
+
+
+class VotingDitutup(Exception):
+    pass
+
+
+def hitung_hasil(admin_id):
+    """
+    Snapshot hasil voting untuk satu admin: [{"kandidat": nama, "total": n}, ...].
+    Menjumlah shard tally (VoteTally), bukan COUNT(*) ke tabel vote.
+    """
+    data = (Kandidat.objects.filter(admin_owner_id=admin_id)
+                .annotate(total=total_votes())
+                .values('nama', 'total')
+                .order_by('-total', 'nama'))
+    return [{"kandidat": r["nama"], "total": r["total"]} for r in data]
+
+
+_format_waktu = serializers.DateTimeField().to_representation
+
+
+def serialisasi_katalog(queryset):
+    """
+    Output sama dengan KandidatListSerializer (tanpa total_votes), tapi lewat
+    values(): tanpa instance model dan tanpa overhead serializer per field.
+    """
+    rows = queryset.values(*KATALOG_FIELDS)
+    return [{**r, 'created_at': _format_waktu(r['created_at'])} for r in rows]
+
+
+def pilih_fields(data, fields):
+    """
+    Sparse fieldset (?fields=a,b): hanya kunci yang diminta, urut sesuai permintaan.
+    """
+    if not fields:
+        return data
+    return [{k: row[k] for k in fields if k in row} for row in data]
+
+
+def daftar_kandidat(admin_id):
+    """
+    Semua kandidat admin (katalog ter-cache) + total suara dari tally, urut terbaru dulu.
+    Katalog diisi dari primary walaupun dipanggil di blok baca_replika: di-cache lama,
+    jadi kandidat yang belum sampai ke replica tidak boleh ikut tertahan di cache.
+    """
+    katalog = katalog_kandidat(admin_id, lambda: serialisasi_katalog(
+        Kandidat.objects.using('default').filter(admin_owner_id=admin_id).order_by('-created_at')))
+    totals = total_per_kandidat(admin_id)
+    return [{**k, 'total_votes': totals.get(k['id'], 0)} for k in katalog]
+
+
+def hasil_final(admin_id):
+    """
+    {"id", "ditutup_at", "hasil", "kandidat"} kalau voting admin sudah ditutup, selain itu None.
+    Dibaca dari primary (seperti daftar_kandidat): status "masih dibuka" ikut di-cache.
+    """
+    def ambil():
+        final = HasilFinal.objects.using('default').filter(admin_id=admin_id).first()
+        if final is None:
+            return None
+        return {"id": final.id, "ditutup_at": final.ditutup_at.isoformat(),
+                "hasil": final.hasil, "kandidat": final.kandidat}
+    return hasil_final_cache(admin_id, ambil)
+
+
+def cek_voting_dibuka(admin_id):
+    """
+    Dipanggil SETELAH insert vote, di transaksi yang sama: insert menunggu lock
+    kandidat yang dipegang tutup_voting, jadi vote yang lolos pasti ikut snapshot.
+    """
+    if HasilFinal.objects.filter(admin_id=admin_id).exists():
+        raise VotingDitutup
+
+
+def hasil_berubah(admin_id):
+    """
+    Setelah commit: versi hasil admin naik (ETag/cache basi) dan viewer live dikabari.
+    Dipanggil signal (api/signals.py) dan jalur bulk yang melewati signal (api/ballot.py).
+    """
+    if admin_id is None:
+        return
+    # live.py mengimpor modul ini
+    from .live import broadcaster
+
+    def kabari():
+        naikkan_versi(admin_id)
+        broadcaster.notify(admin_id)
+    transaction.on_commit(kabari)
+
+
+def tutup_voting(admin):
+    """
+    Tutup voting ruang admin: hitung hasil & daftar kandidat sekali, simpan
+    sebagai HasilFinal. Return None kalau sudah ditutup sebelumnya.
+    """
+    with transaction.atomic():
+        # Kunci kandidat: vote yang sedang berjalan selesai dulu, vote baru menunggu
+        # lalu ditolak cek_voting_dibuka()
+        list(Kandidat.objects.select_for_update().filter(admin_owner=admin).values_list('id', flat=True))
+        if HasilFinal.objects.filter(admin=admin).exists():
+            return None
+        lupakan_katalog(admin.id)
+        # cache & viewer live diberi tahu lewat signal (api/signals.py)
+        return HasilFinal.objects.create(admin=admin, hasil=hitung_hasil(admin.id), kandidat=daftar_kandidat(admin.id))
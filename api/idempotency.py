@@ -0,0 +1,136 @@
+"""
+Idempotency-Key untuk POST vote. Klien mobile di jaringan jelek mengulang
+request yang sama; hasil pertama disimpan sebentar (per user + key) dan
+ulangan dijawab dari sini tanpa validasi/query DB lagi. Autentikasi tetap
+dicek: tanda tangan token + versi token (cache), seperti ClaimsJWTAuthentication.
+
+Penyimpanan: LRU in-process berukuran terbatas (IDEMPOTENCY_MAX_KEYS, TTL
+IDEMPOTENCY_TTL) di depan cache bersama IDEMPOTENCY_CACHE_ALIAS (None = LRU saja).
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .admission import token_akses
+from .authentication import cek_versi_token
+from .cache import LRUCache, versi_token
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+MAKS_PANJANG_KEY = 255
+# Hasil yang pasti sama kalau diulang (sukses, sudah vote, ditolak, kandidat tidak ada).
+# 401/429/5xx tidak disimpan: ulangan berikutnya boleh mencoba lagi.
+STATUS_DISIMPAN = {201, 400, 403, 404}
+
+
+class IdempotencyStore:
+    def __init__(self):
+        self._lru = None
+
+    @property
+    def lru(self):
+        if self._lru is None:
+            self._lru = LRUCache(settings.IDEMPOTENCY_MAX_KEYS, settings.IDEMPOTENCY_TTL)
+        return self._lru
+
+    def _shared(self):
+        alias = settings.IDEMPOTENCY_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def get(self, key):
+        nilai = self.lru.get(key)
+        if nilai is None and (shared := self._shared()) is not None:
+            nilai = shared.get(key)
+            if nilai is not None:
+                self.lru.set(key, nilai)
+        return nilai
+
+    def simpan(self, key, nilai):
+        """
+        Hasil sukses (201) selalu menang; hasil lain hanya kalau key belum ada,
+        supaya ulangan yang kalah balapan ("sudah vote") tidak menimpa 201.
+        """
+        shared = self._shared()
+        if nilai[1] == 201:
+            self.lru.set(key, nilai)
+            if shared is not None:
+                shared.set(key, nilai, settings.IDEMPOTENCY_TTL)
+            return
+        if shared is not None and not shared.add(key, nilai, settings.IDEMPOTENCY_TTL):
+            return
+        if self.lru.get(key) is None:
+            self.lru.set(key, nilai)
+
+    def clear(self):
+        self.lru.clear()
+
+
+store = IdempotencyStore()
+
+
+def _kunci(request):
+    """
+    (key store, sidik body) untuk request ini, None kalau tanpa header atau tanpa
+    token yang masih berlaku (view yang menjawab 401), atau response 400 kalau key
+    tidak valid. Token yang dibatalkan (ganti password, user nonaktif/dihapus)
+    tidak bisa memutar ulang hasil lama.
+    """
+    raw = request.META.get(HEADER)
+    if not raw:
+        return None
+    if len(raw) > MAKS_PANJANG_KEY:
+        return JsonResponse({"error": f"Idempotency-Key maksimal {MAKS_PANJANG_KEY} karakter."}, status=400)
+    token = token_akses(request)
+    if token is None:
+        return None
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    try:
+        cek_versi_token(token, versi_token(user_id))
+    except AuthenticationFailed:
+        return None
+    digest = hashlib.sha256(raw.encode()).hexdigest()
+    key = f"idem:{request.resolver_match.url_name}:{user_id}:{digest}"
+    return key, hashlib.sha256(request.body).hexdigest()
+
+
+def _replay(tersimpan, sidik):
+    sidik_asal, status, content, content_type = tersimpan
+    if sidik_asal != sidik:
+        return JsonResponse({"error": "Idempotency-Key sudah dipakai untuk request lain."}, status=422)
+    response = HttpResponse(content, status=status, content_type=content_type)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _rekam(key, sidik, response):
+    if response.status_code not in STATUS_DISIMPAN:
+        return
+    if hasattr(response, 'render'):
+        response.render()  # DRF Response: simpan bytes yang benar-benar dikirim
+    store.simpan(key, (sidik, response.status_code, response.content, response['Content-Type']))
+
+
+def idempoten(view):
+    """
+    Decorator view POST: header Idempotency-Key yang pernah
+    dipakai user yang sama dijawab ulang dari store (status & body asli).
+    Key sama dengan body berbeda -> 422.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        kunci = _kunci(request)
+        if kunci is None:
+            return view(request, *args, **kwargs)
+        if isinstance(kunci, HttpResponse):
+            return kunci
+        key, sidik = kunci
+        if (tersimpan := store.get(key)) is not None:
+            return _replay(tersimpan, sidik)
+        response = view(request, *args, **kwargs)
+        _rekam(key, sidik, response)
+        return response
+    return wrapper
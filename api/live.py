@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from .hasil import hitung_hasil
+
+
+class _Saluran:
+    """
+    State satu admin yang sedang ditonton: daftar viewer + snapshot terakhir.
+    """
+
+    def __init__(self):
+        self.subscribers = set()   # {(loop, asyncio.Queue)}
+        self.snapshot = None
+        self.event = threading.Event()
+        self.thread = None
+
+
+def _taruh(queue, snapshot):
+    # Viewer lambat cukup dapat snapshot terbaru, snapshot lama dibuang.
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(snapshot)
+
+
+class HasilBroadcaster:
+    """
+    Fan-out hasil voting per admin ke semua viewer SSE di proses ini.
+
+    Satu thread per admin yang sedang ditonton menghitung snapshot, lalu
+    membagikannya ke semua viewer; ratusan viewer = satu query. Thread bangun
+    saat `notify()` dipanggil (vote tercatat di proses ini), paling cepat sekali
+    per `interval` detik, dan juga tiap `poll` detik untuk menangkap vote yang
+    masuk lewat worker lain. Snapshot hanya dikirim kalau isinya berubah.
+    """
+
+    def __init__(self, interval=None, poll=None):
+        self._interval = interval
+        self._poll = poll
+        self._lock = threading.Lock()
+        self._saluran = {}
+
+    @property
+    def interval(self):
+        return settings.HASIL_STREAM_INTERVAL if self._interval is None else self._interval
+
+    @property
+    def poll(self):
+        return settings.HASIL_STREAM_POLL if self._poll is None else self._poll
+
+    def subscribe(self, admin_id):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=1)
+        with self._lock:
+            saluran = self._saluran.get(admin_id)
+            if saluran is None:
+                saluran = self._saluran[admin_id] = _Saluran()
+            saluran.subscribers.add((loop, queue))
+            if saluran.snapshot is not None:
+                queue.put_nowait(saluran.snapshot)
+            if saluran.thread is None:
+                saluran.thread = threading.Thread(
+                    target=self._jalan, args=(admin_id, saluran),
+                    name=f"hasil-stream-{admin_id}", daemon=True,
+                )
+                saluran.thread.start()
+        return queue
+
+    def unsubscribe(self, admin_id, queue):
+        with self._lock:
+            saluran = self._saluran.get(admin_id)
+            if saluran is None:
+                return
+            saluran.subscribers = {s for s in saluran.subscribers if s[1] is not queue}
+            if not saluran.subscribers:
+                del self._saluran[admin_id]
+                saluran.event.set()
+
+    def has_subscribers(self):
+        return bool(self._saluran)
+
+    def notify(self, admin_id):
+        """
+        Tandai hasil admin ini berubah. Aman dipanggil dari thread mana pun.
+        """
+        saluran = self._saluran.get(admin_id)
+        if saluran is not None:
+            saluran.event.set()
+
+    def _kirim(self, saluran, snapshot):
+        with self._lock:
+            subscribers = list(saluran.subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_taruh, queue, snapshot)
+            except RuntimeError:
+                # event loop viewer sudah ditutup
+                pass
+
+    def _jalan(self, admin_id, saluran):
+        try:
+            while True:
+                with self._lock:
+                    if self._saluran.get(admin_id) is not saluran:
+                        return
+                saluran.event.clear()
+                snapshot = hitung_hasil(admin_id)
+                if snapshot != saluran.snapshot:
+                    saluran.snapshot = snapshot
+                    self._kirim(saluran, snapshot)
+                # Coalescing: burst vote dalam `interval` detik = satu push
+                if self.interval:
+                    time.sleep(self.interval)
+                saluran.event.wait(self.poll or None)
+        finally:
+            connections.close_all()
+
+
+broadcaster = HasilBroadcaster()
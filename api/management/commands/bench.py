@@ -0,0 +1,78 @@
+import json
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from api.penulis import penulis
+from api.bench import SKENARIO, PembungkusDB, bandingkan, jalankan, ringkas, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark beban pemilihan di database sementara (test DB dari DATABASE_URL): "
+        "login storm, burst vote dan viewer hasil/kandidat, mis. `bench hasil --concurrency 4 --db-latency 5`. "
+        "Antrian tulis SQLite: `bench vote_hasil --simpan a.json` lalu `bench vote_hasil --write-queue --baseline a.json`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('skenario', nargs='*', help=f"Default: login vote hasil kandidat. Tersedia: {', '.join(SKENARIO)}")
+        parser.add_argument('--admins', type=int, default=2)
+        parser.add_argument('--kandidat', type=int, default=5)
+        parser.add_argument('--peserta', type=int, default=200, help="Peserta per admin.")
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help="Jumlah thread (= jumlah worker WSGI).")
+        parser.add_argument('--db-latency', type=float, default=0.0,
+                            help="Latency buatan per query DB dalam ms, meniru round trip ke server database.")
+        parser.add_argument('--write-queue', action='store_true',
+                            help="Aktifkan SQLITE_WRITE_QUEUE (penulis tunggal + batch, api/penulis.py) selama benchmark.")
+        parser.add_argument('--seed', type=int, default=0, help="Seed random agar hasil bisa diulang.")
+        parser.add_argument('--baseline', help="File JSON baseline; gagal kalau ada regresi.")
+        parser.add_argument('--toleransi', type=float, default=0.2, help="Toleransi regresi latency/rps (0.2 = 20%%).")
+        parser.add_argument('--simpan', help="Tulis ringkasan ke file JSON (bisa dipakai sebagai baseline).")
+
+    def handle(self, *args, **options):
+        nama_skenario = options['skenario'] or ['login', 'vote', 'hasil', 'kandidat']
+        tidak_dikenal = [n for n in nama_skenario if n not in SKENARIO]
+        if tidak_dikenal:
+            raise CommandError(f"Skenario tidak dikenal: {', '.join(tidak_dikenal)}")
+        random.seed(options['seed'])
+
+        if connection.vendor == 'sqlite':
+            # diukur dengan mode produksi SQLite walaupun SQLITE_WAL tidak diset
+            connection.settings_dict['OPTIONS'] = settings.SQLITE_OPTIONS_PRODUKSI
+        setup_test_environment()
+        lama = setup_databases(verbosity=0, interactive=False)
+        try:
+            cache.clear()
+            ktx = seed(options['admins'], options['kandidat'], options['peserta'])
+            ringkasan = {}
+            with PembungkusDB(latency=options['db_latency'] / 1000), \
+                    override_settings(SQLITE_WRITE_QUEUE=options['write_queue']):
+                for nama in nama_skenario:
+                    ringkasan.update(ringkas(jalankan(SKENARIO[nama](ktx), options['concurrency'])))
+        finally:
+            penulis.berhenti()
+            teardown_databases(lama, verbosity=0)
+            teardown_test_environment()
+
+        self.tampilkan(ringkasan)
+        if options['simpan']:
+            with open(options['simpan'], 'w') as f:
+                json.dump(ringkasan, f, indent=2)
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                regresi = bandingkan(ringkasan, json.load(f), options['toleransi'])
+            if regresi:
+                raise CommandError("Regresi terhadap baseline:\n  " + "\n  ".join(regresi))
+            self.stdout.write(self.style.SUCCESS("Tidak ada regresi terhadap baseline."))
+
+    def tampilkan(self, ringkasan):
+        kolom = ['requests', 'errors', 'p50_ms', 'p95_ms', 'p99_ms', 'rps', 'queries']
+        self.stdout.write(f"{'endpoint':<14}" + "".join(f"{k:>10}" for k in kolom))
+        for endpoint, stat in ringkasan.items():
+            self.stdout.write(f"{endpoint:<14}" + "".join(f"{stat[k]:>10}" for k in kolom))
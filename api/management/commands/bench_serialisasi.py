@@ -0,0 +1,59 @@
+import timeit
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.hasil import _format_waktu, pilih_fields
+from api.models import Kandidat
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import KandidatListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark serialisasi daftar kandidat (tanpa database): ModelSerializer vs "
+        "jalur values()/dict, sparse ?fields=, dan JSONRenderer vs FastJSONRenderer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--ulang', type=int, default=20, help="Jumlah ulangan per kasus (diambil yang tercepat).")
+
+    def handle(self, *args, **options):
+        n, ulang = options['rows'], options['ulang']
+        waktu = timezone.now()
+        instances = []
+        for i in range(n):
+            k = Kandidat(id=i + 1, admin_owner_id=1, nama=f"Kandidat {i}", visi="visi " * 40,
+                         misi="misi " * 80, foto_url=f"https://contoh.id/foto/{i}.jpg",
+                         created_at=waktu - timedelta(minutes=i))
+            k.total_votes = i * 3
+            instances.append(k)
+        # bentuk baris values() seperti serialisasi_katalog
+        baris = [{
+            'id': k.id, 'nama': k.nama, 'visi': k.visi, 'misi': k.misi, 'foto_url': k.foto_url,
+            'created_at': k.created_at, 'total_votes': k.total_votes,
+        } for k in instances]
+
+        def dari_dict():
+            return [{**b, 'created_at': _format_waktu(b['created_at'])} for b in baris]
+
+        data = dari_dict()
+        sparse = pilih_fields(data, ['id', 'nama', 'total_votes'])
+        drf, cepat = JSONRenderer(), FastJSONRenderer()
+        kasus = [
+            ("serializer (ModelSerializer many=True)", lambda: KandidatListSerializer(instances, many=True).data),
+            ("values() -> dict", dari_dict),
+            ("sparse ?fields=id,nama,total_votes", lambda: pilih_fields(dari_dict(), ['id', 'nama', 'total_votes'])),
+            ("render JSONRenderer", lambda: drf.render(data)),
+            ("render FastJSONRenderer", lambda: cepat.render(data)),
+            ("render sparse FastJSONRenderer", lambda: cepat.render(sparse)),
+        ]
+
+        self.stdout.write(f"{n} baris, terbaik dari {ulang}x; orjson {'terpasang' if orjson else 'TIDAK terpasang'}")
+        for nama, fungsi in kasus:
+            detik = min(timeit.repeat(fungsi, number=1, repeat=ulang))
+            self.stdout.write(f"  {nama:<40} {detik * 1000:8.2f} ms")
+        self.stdout.write(f"  ukuran JSON penuh {len(drf.render(data)):,} B, sparse {len(drf.render(sparse)):,} B")
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from api.ballot import kunci_kiosk
+
+
+class Command(BaseCommand):
+    help = "Tampilkan kunci HMAC kiosk offline milik admin USERNAME (untuk menandatangani /api/ballot-batch/)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+
+    def handle(self, *args, **options):
+        admin_id = (get_user_model().objects.filter(username=options['username'], is_app_admin=True)
+                        .values_list('id', flat=True).first())
+        if admin_id is None:
+            raise CommandError(f"Admin {options['username']} tidak ditemukan.")
+        try:
+            self.stdout.write(kunci_kiosk(admin_id))
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from api.models import Kandidat, Vote, VoteTally
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang / verifikasi tally kandidat (shard VoteTally) dari baris Vote mentah."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help="Hanya verifikasi; exit code 1 kalau ada tally yang selisih.")
+        parser.add_argument('--admin', help="Batasi ke kandidat milik admin USERNAME.")
+
+    def handle(self, *args, **options):
+        qs = Kandidat.objects.all()
+        if options['admin']:
+            qs = qs.filter(admin_owner__username=options['admin'])
+
+        jumlah = (Vote.objects.filter(kandidat=OuterRef('pk'))
+                      .order_by().values('kandidat').annotate(c=Count('id')).values('c'))
+        tersimpan = (VoteTally.objects.filter(kandidat=OuterRef('pk'))
+                         .order_by().values('kandidat').annotate(t=Sum('total')).values('t'))
+        with transaction.atomic():
+            # Kunci baris kandidat: insert vote/shard baru (cek FK ke kandidat)
+            # menunggu sampai tally baru ditulis, lalu menambah di atasnya.
+            rows = (qs.select_for_update(of=('self',))
+                      .annotate(tally=Coalesce(Subquery(tersimpan), 0), hitung=Coalesce(Subquery(jumlah), 0))
+                      .values_list('id', 'nama', 'tally', 'hitung'))
+            selisih = [(pk, nama, tally, hitung) for pk, nama, tally, hitung in rows if tally != hitung]
+
+            for pk, nama, tally, hitung in selisih:
+                self.stdout.write(f"kandidat #{pk} {nama}: tally={tally}, vote={hitung}")
+                if not options['check']:
+                    VoteTally.objects.filter(kandidat_id=pk).delete()
+                    VoteTally.objects.create(kandidat_id=pk, shard=0, total=hitung)
+
+        if options['check']:
+            if selisih:
+                raise CommandError(f"{len(selisih)} tally kandidat tidak cocok.")
+            self.stdout.write(self.style.SUCCESS("Semua tally cocok."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(selisih)} tally kandidat diperbaiki."))
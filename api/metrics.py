@@ -0,0 +1,251 @@
+"""
+Metrik per view (latency, jumlah query DB, waktu DB) dalam format teks Prometheus.
+
+Tiap proses menyimpan counter di memori dan menuliskannya berkala ke
+METRICS_DIR/metrics-<pid>.json; endpoint /api/metrics/ menjumlahkan semua
+file itu, jadi angka dari semua worker gunicorn ikut terhitung. File worker
+yang sudah mati dilebur ke metrics-arsip.json (counter tidak mundur, jumlah
+file tidak terus bertambah): lewat hook gunicorn child_exit
+(tandai_proses_mati) dan dicek ulang setiap scrape.
+"""
+import glob
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+try:
+    import fcntl
+except ImportError:  # non-Unix: tanpa gunicorn, tanpa kunci antar proses
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+FILE_ARSIP = 'metrics-arsip.json'
+_FILE_PID = re.compile(r'metrics-(\d+)\.json$')
+
+
+def _histogram(buckets):
+    return {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+
+
+def _observe(hist, buckets, nilai):
+    for i, batas in enumerate(buckets):
+        if nilai <= batas:
+            hist['buckets'][i] += 1
+    hist['sum'] += nilai
+    hist['count'] += 1
+
+
+def _gabung_hist(a, b):
+    a['buckets'] = [x + y for x, y in zip(a['buckets'], b['buckets'])]
+    a['sum'] += b['sum']
+    a['count'] += b['count']
+
+
+def _gabung_views(total, views):
+    for view, v in views.items():
+        if view not in total:
+            total[view] = v
+            continue
+        _gabung_hist(total[view]['latency'], v['latency'])
+        _gabung_hist(total[view]['queries'], v['queries'])
+        total[view]['db_time'] += v['db_time']
+    return total
+
+
+def _baca(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _tulis_atomic(folder, nama, data):
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix='.tmp-metrics-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(data)
+    os.replace(tmp, os.path.join(folder, nama))
+
+
+def _proses_hidup(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def tandai_proses_mati(pid, folder=None):
+    """
+    Lebur metrics-<pid>.json ke metrics-arsip.json lalu hapus. Untuk hook
+    gunicorn `child_exit` (lihat gunicorn.conf.py); aman dipanggil berulang.
+    """
+    folder = folder or settings.METRICS_DIR
+    if not folder:
+        return
+    path = os.path.join(folder, f'metrics-{pid}.json')
+    if not os.path.exists(path):
+        return
+    with open(os.path.join(folder, '.metrics.lock'), 'a') as kunci:
+        if fcntl is not None:
+            fcntl.flock(kunci, fcntl.LOCK_EX)
+        # dicek ulang di dalam kunci: proses lain mungkin sudah meleburnya
+        views = _baca(path)
+        if views is None:
+            return
+        arsip = _baca(os.path.join(folder, FILE_ARSIP)) or {}
+        _tulis_atomic(folder, FILE_ARSIP, json.dumps(_gabung_views(arsip, views)))
+        os.remove(path)
+
+
+def _bersihkan_proses_mati(folder):
+    for path in glob.glob(os.path.join(folder, 'metrics-*.json')):
+        cocok = _FILE_PID.search(path)
+        if not cocok:
+            continue
+        pid = int(cocok.group(1))
+        if pid != os.getpid() and not _proses_hidup(pid):
+            tandai_proses_mati(pid, folder)
+
+
+class MetricsStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._terakhir_flush = 0.0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.views = {}
+
+    def catat(self, view, latency, queries, db_time):
+        with self._lock:
+            v = self.views.get(view)
+            if v is None:
+                v = self.views[view] = {
+                    'latency': _histogram(LATENCY_BUCKETS),
+                    'queries': _histogram(QUERY_BUCKETS),
+                    'db_time': 0.0,
+                }
+            _observe(v['latency'], LATENCY_BUCKETS, latency)
+            _observe(v['queries'], QUERY_BUCKETS, queries)
+            v['db_time'] += db_time
+        if settings.METRICS_DIR and time.monotonic() - self._terakhir_flush >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """
+        Tulis snapshot proses ini ke METRICS_DIR (atomic rename, aman dibaca proses lain).
+        """
+        if not settings.METRICS_DIR:
+            return
+        with self._lock:
+            data = json.dumps(self.views)
+            self._terakhir_flush = time.monotonic()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        _tulis_atomic(settings.METRICS_DIR, f'metrics-{os.getpid()}.json', data)
+
+    def agregat(self):
+        """
+        Gabungan metrik semua proses (file di METRICS_DIR) atau proses ini saja.
+        File worker yang sudah mati dilebur ke arsip dulu.
+        """
+        if not settings.METRICS_DIR:
+            with self._lock:
+                return json.loads(json.dumps(self.views))
+        self.flush()
+        _bersihkan_proses_mati(settings.METRICS_DIR)
+        total = {}
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, 'metrics-*.json')):
+            views = _baca(path)
+            if views is not None:
+                _gabung_views(total, views)
+        return total
+
+
+store = MetricsStore()
+
+
+def _label(view):
+    return view.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _tulis_hist(baris, nama, view, hist, buckets):
+    for batas, jumlah in zip(buckets, hist['buckets']):
+        baris.append(f'{nama}_bucket{{view="{view}",le="{batas}"}} {jumlah}')
+    baris.append(f'{nama}_bucket{{view="{view}",le="+Inf"}} {hist["count"]}')
+    baris.append(f'{nama}_sum{{view="{view}"}} {hist["sum"]}')
+    baris.append(f'{nama}_count{{view="{view}"}} {hist["count"]}')
+
+
+def render_prometheus(views):
+    baris = [
+        '# HELP voting_request_duration_seconds Latency request per view.',
+        '# TYPE voting_request_duration_seconds histogram',
+    ]
+    for view, v in sorted(views.items()):
+        _tulis_hist(baris, 'voting_request_duration_seconds', _label(view), v['latency'], LATENCY_BUCKETS)
+    baris += [
+        '# HELP voting_db_queries Jumlah query DB per request.',
+        '# TYPE voting_db_queries histogram',
+    ]
+    for view, v in sorted(views.items()):
+        _tulis_hist(baris, 'voting_db_queries', _label(view), v['queries'], QUERY_BUCKETS)
+    baris += [
+        '# HELP voting_db_seconds_total Total waktu query DB per view.',
+        '# TYPE voting_db_seconds_total counter',
+    ]
+    for view, v in sorted(views.items()):
+        baris.append(f'voting_db_seconds_total{{view="{_label(view)}"}} {v["db_time"]}')
+    return '\n'.join(baris) + '\n'
+
+
+class _PenghitungQuery:
+    def __init__(self):
+        self.jumlah = 0
+        self.waktu = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        mulai = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.waktu += time.perf_counter() - mulai
+            self.jumlah += 1
+
+
+class MetricsMiddleware:
+    """
+    Catat latency, jumlah query dan waktu DB per view name. Kalau
+    METRICS_ENABLED=False middleware ini dilepas Django saat startup (tanpa overhead).
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        penghitung = _PenghitungQuery()
+        mulai = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(penghitung))
+            response = self.get_response(request)
+        latency = time.perf_counter() - mulai
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match._func_path) if match else 'unmatched'
+        store.catat(view, latency, penghitung.jumlah, penghitung.waktu)
+        return response
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def isi_total_votes(apps, schema_editor):
+    Kandidat = apps.get_model('api', 'Kandidat')
+    Vote = apps.get_model('api', 'Vote')
+    jumlah = (Vote.objects.filter(kandidat=OuterRef('pk'))
+                  .order_by().values('kandidat').annotate(c=Count('id')).values('c'))
+    Kandidat.objects.update(total_votes=Coalesce(Subquery(jumlah), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kandidat',
+            name='total_votes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(isi_total_votes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_kandidat_total_votes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['admin_owner', 'is_participant', 'date_joined', 'id'], name='user_peserta_joined_idx'),
+        ),
+    ]
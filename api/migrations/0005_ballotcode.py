@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BallotCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('used_at', models.DateTimeField(blank=True, null=True)),
+                ('peserta', models.OneToOneField(limit_choices_to={'is_participant': True}, on_delete=django.db.models.deletion.CASCADE, related_name='ballot_code', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def pindah_ke_shard(apps, schema_editor):
+    # tally lama masuk ke shard 0; vote berikutnya menyebar ke shard lain
+    Kandidat = apps.get_model('api', 'Kandidat')
+    VoteTally = apps.get_model('api', 'VoteTally')
+    VoteTally.objects.bulk_create(
+        [VoteTally(kandidat_id=pk, shard=0, total=total)
+         for pk, total in Kandidat.objects.filter(total_votes__gt=0).values_list('pk', 'total_votes').iterator()],
+        batch_size=1000,
+    )
+
+
+def kembali_ke_kolom(apps, schema_editor):
+    Kandidat = apps.get_model('api', 'Kandidat')
+    VoteTally = apps.get_model('api', 'VoteTally')
+    jumlah = (VoteTally.objects.filter(kandidat=OuterRef('pk'))
+                  .order_by().values('kandidat').annotate(t=Sum('total')).values('t'))
+    Kandidat.objects.update(total_votes=Coalesce(Subquery(jumlah), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_ballotcode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('kandidat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tally_shards', to='api.kandidat')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kandidat', 'shard'), name='unique_tally_shard')],
+            },
+        ),
+        migrations.RunPython(pindah_ke_shard, kembali_ke_kolom),
+        migrations.RemoveField(
+            model_name='kandidat',
+            name='total_votes',
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_votetally'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_peserta_joined_idx',
+        ),
+        migrations.AddIndex(
+            model_name='kandidat',
+            index=models.Index(fields=['admin_owner', '-created_at'], name='kandidat_admin_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['admin_owner', 'date_joined', 'id'], name='user_peserta_joined_idx'),
+        ),
+    ]
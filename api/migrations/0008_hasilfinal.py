@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HasilFinal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ditutup_at', models.DateTimeField(auto_now_add=True)),
+                ('hasil', models.JSONField()),
+                ('kandidat', models.JSONField()),
+                ('admin', models.OneToOneField(limit_choices_to={'is_app_admin': True}, on_delete=django.db.models.deletion.CASCADE, related_name='hasil_final', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
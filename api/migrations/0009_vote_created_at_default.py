@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_hasilfinal'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='vote',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
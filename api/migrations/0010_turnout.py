@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:23
+
+from datetime import timezone
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMinute
+
+
+def isi_dari_data_lama(apps, schema_editor):
+    # agregat awal dari data yang sudah ada; vote lama masuk shard 0
+    User = apps.get_model('api', 'User')
+    Vote = apps.get_model('api', 'Vote')
+    JumlahPeserta = apps.get_model('api', 'JumlahPeserta')
+    VoteMenit = apps.get_model('api', 'VoteMenit')
+    peserta = (User.objects.filter(is_participant=True, admin_owner__isnull=False)
+                   .values('admin_owner').annotate(n=Count('id')).values_list('admin_owner', 'n'))
+    JumlahPeserta.objects.bulk_create([JumlahPeserta(admin_id=a, total=n) for a, n in peserta], batch_size=1000)
+    per_menit = (Vote.objects.annotate(m=TruncMinute('created_at', tzinfo=timezone.utc))
+                     .values('kandidat__admin_owner', 'm').annotate(n=Count('id'))
+                     .values_list('kandidat__admin_owner', 'm', 'n'))
+    VoteMenit.objects.bulk_create(
+        [VoteMenit(admin_id=a, menit=m, shard=0, total=n) for a, m, n in per_menit.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_vote_created_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JumlahPeserta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('admin', models.OneToOneField(limit_choices_to={'is_app_admin': True}, on_delete=django.db.models.deletion.CASCADE, related_name='jumlah_peserta', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VoteMenit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('menit', models.DateTimeField()),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('admin', models.ForeignKey(limit_choices_to={'is_app_admin': True}, on_delete=django.db.models.deletion.CASCADE, related_name='vote_per_menit', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('admin', 'menit', 'shard'), name='unique_vote_menit_shard')],
+            },
+        ),
+        migrations.RunPython(isi_dari_data_lama, migrations.RunPython.noop),
+    ]
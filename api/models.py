@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from django.conf import settings
 
 class User(AbstractUser):
@@ -18,6 +19,16 @@ class User(AbstractUser):
     )
     # Peserta wajib ganti password saat login pertama
     must_change_password = models.BooleanField(default=False)
+    # Naik saat password diganti; JWT dengan klaim "tv" lama jadi tidak berlaku
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Daftar peserta per admin, urut (date_joined, id) untuk keyset pagination.
+            # Tanpa is_participant: admin_owner hanya terisi untuk peserta, dan filter
+            # boolean tidak selalu dikompilasi jadi "= true" yang bisa memakai kolom index.
+            models.Index(fields=['admin_owner', 'date_joined', 'id'], name='user_peserta_joined_idx'),
+        ]
 
     def __str__(self):
         role = "admin" if self.is_app_admin else ("peserta" if self.is_participant else "user")
@@ -37,6 +48,12 @@ class Kandidat(models.Model):
     foto_url = models.URLField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Daftar kandidat per admin, urut terbaru dulu (KandidatViewSet / katalog)
+            models.Index(fields=['admin_owner', '-created_at'], name='kandidat_admin_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.nama} (admin: {self.admin_owner.username})"
 
@@ -49,7 +66,8 @@ class Vote(models.Model):
         limit_choices_to={'is_participant': True}
     )
     kandidat = models.ForeignKey(Kandidat, on_delete=models.CASCADE, related_name='votes')
-    created_at = models.DateTimeField(auto_now_add=True)
+    # default (bukan auto_now_add) supaya upload batch kiosk offline bisa membawa waktu vote asli
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         # satu peserta hanya boleh punya satu vote total
@@ -59,3 +77,102 @@ class Vote(models.Model):
 
     def __str__(self):
         return f"{self.voter.username} -> {self.kandidat.nama}"
+
+
+class HasilFinal(models.Model):
+    """
+    Snapshot hasil & daftar kandidat saat admin menutup voting (/api/tutup-voting/).
+    Setelah ada, vote ke ruang admin ini ditolak dan hasil/kandidat dilayani dari sini.
+    """
+    admin = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='hasil_final',
+        limit_choices_to={'is_app_admin': True}
+    )
+    ditutup_at = models.DateTimeField(auto_now_add=True)
+    hasil = models.JSONField()
+    kandidat = models.JSONField()
+
+    def __str__(self):
+        return f"hasil final {self.admin.username} ({self.ditutup_at:%Y-%m-%d %H:%M})"
+
+
+class VoteTally(models.Model):
+    """
+    Tally suara kandidat, dipecah jadi beberapa baris (shard) supaya vote
+    bersamaan untuk kandidat yang sama tidak antre di satu row lock.
+    Total kandidat = SUM(total) semua shard-nya (lihat api/tally.py).
+    """
+    kandidat = models.ForeignKey(Kandidat, on_delete=models.CASCADE, related_name='tally_shards')
+    shard = models.PositiveSmallIntegerField()
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kandidat', 'shard'], name='unique_tally_shard')
+        ]
+
+    def __str__(self):
+        return f"{self.kandidat.nama} #{self.shard}: {self.total}"
+
+
+class BallotCode(models.Model):
+    """
+    Kode login sekali pakai untuk peserta (pengganti username+password).
+    Hanya HMAC kode yang disimpan, bukan kodenya (lihat api/ballot.py).
+    """
+    peserta = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='ballot_code',
+        limit_choices_to={'is_participant': True}
+    )
+    digest = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    used_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        status = "terpakai" if self.used_at else "belum dipakai"
+        return f"kode {self.peserta.username} ({status})"
+
+
+class JumlahPeserta(models.Model):
+    """
+    Jumlah peserta milik admin, dijaga inkremental (api/turnout.py) supaya
+    statistik turnout tidak perlu COUNT atas seluruh peserta.
+    """
+    admin = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='jumlah_peserta',
+        limit_choices_to={'is_app_admin': True}
+    )
+    total = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.admin.username}: {self.total} peserta"
+
+
+class VoteMenit(models.Model):
+    """
+    Rollup jumlah vote ruang admin per menit (dipecah per shard seperti
+    VoteTally). Total sudah vote = SUM(total) semua baris admin.
+    """
+    admin = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='vote_per_menit',
+        limit_choices_to={'is_app_admin': True}
+    )
+    menit = models.DateTimeField()
+    shard = models.PositiveSmallIntegerField()
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['admin', 'menit', 'shard'], name='unique_vote_menit_shard')
+        ]
+
+    def __str__(self):
+        return f"{self.admin.username} {self.menit:%Y-%m-%d %H:%M} #{self.shard}: {self.total}"
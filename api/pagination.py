@@ -0,0 +1,90 @@
+import base64
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination:
+    """
+    Pagination keyset pada (date_joined, id): halaman berikutnya diambil dengan
+    WHERE (date_joined, id) > cursor, tanpa OFFSET scan. Total hitungan opsional:
+    ?count=none (default), ?count=approx (hitungan di-cache), ?count=exact.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    count_modes = ('none', 'approx', 'exact')
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self._page_size(request)
+        self.count_mode = request.query_params.get('count', 'none')
+        if self.count_mode not in self.count_modes:
+            raise ValidationError({"count": f"Pilih salah satu: {', '.join(self.count_modes)}."})
+        self.count = self._hitung(queryset)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            joined, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(Q(date_joined__gt=joined) | Q(date_joined=joined, id__gt=pk))
+        page = list(queryset.order_by('date_joined', 'id')[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        page = page[:self.page_size]
+        self.last = page[-1] if page else None
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last))
+
+    def encode_cursor(self, obj):
+        # baris bisa instance model atau dict dari values()
+        joined, pk = (obj['date_joined'], obj['id']) if isinstance(obj, dict) else (obj.date_joined, obj.id)
+        raw = f"{joined.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            joined, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            joined = parse_datetime(joined)
+            pk = int(pk)
+        except (ValueError, UnicodeDecodeError):
+            joined = None
+        if joined is None:
+            raise ValidationError({"cursor": "Cursor tidak valid."})
+        return joined, pk
+
+    def _page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, settings.REST_FRAMEWORK['PAGE_SIZE']))
+        except ValueError:
+            size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        return max(1, min(size, self.max_page_size))
+
+    def _hitung(self, queryset):
+        if self.count_mode == 'none':
+            return None
+        if self.count_mode == 'exact':
+            return queryset.count()
+        url = remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        key = f"keyset:count:{self.request.user.pk}:{hashlib.md5(url.encode()).hexdigest()}"
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, settings.KEYSET_APPROX_COUNT_TIMEOUT)
+        return count
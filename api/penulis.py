@@ -0,0 +1,109 @@
+"""
+Antrian tulis tunggal untuk SQLite (SQLITE_WRITE_QUEUE).
+
+SQLite hanya mengizinkan satu penulis; banyak thread/worker yang menulis
+bersamaan saling menunggu lock dan tiap vote membayar satu commit (fsync).
+Di sini semua tulisan dari proses ini dikerjakan satu thread penulis: operasi
+yang masuk berdekatan dikumpulkan jadi satu transaksi (savepoint per operasi),
+jadi satu commit melayani banyak vote dan thread pembaca tidak pernah antre lock.
+"""
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+
+class PenulisTunggal:
+    def __init__(self):
+        self._antrian = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def jalankan(self, fungsi, *args, **kwargs):
+        """
+        Kerjakan fungsi(*args, **kwargs) di thread penulis dan tunggu hasilnya
+        (exception ikut diteruskan ke pemanggil).
+        """
+        future = Future()
+        self._pastikan_jalan()
+        # context pemanggil ikut (mis. penanda tulis untuk ReplicaPinMiddleware)
+        konteks = contextvars.copy_context()
+        self._antrian.put((konteks.run, (fungsi, *args), kwargs, future))
+        return future.result()
+
+    def berhenti(self):
+        """
+        Hentikan thread penulis (dan tutup koneksinya), mis. di akhir test.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._antrian.put(None)
+            thread.join()
+
+    def _pastikan_jalan(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='penulis-sqlite', daemon=True)
+                self._thread.start()
+
+    def _ambil_batch(self):
+        pertama = self._antrian.get()
+        if pertama is None:
+            return None
+        batch = [pertama]
+        batas = time.monotonic() + settings.SQLITE_WRITE_WAIT_MS / 1000
+        while len(batch) < settings.SQLITE_WRITE_BATCH:
+            try:
+                item = self._antrian.get(timeout=max(0, batas - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                self._antrian.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self):
+        try:
+            while (batch := self._ambil_batch()) is not None:
+                close_old_connections()
+                self._tulis(batch)
+        finally:
+            connection.close()
+
+    def _tulis(self, batch):
+        hasil = []
+        try:
+            with transaction.atomic():
+                for fungsi, args, kwargs, _ in batch:
+                    try:
+                        with transaction.atomic():
+                            hasil.append((True, fungsi(*args, **kwargs)))
+                    except Exception as e:
+                        hasil.append((False, e))
+        except Exception as e:
+            # commit gagal: semua operasi batch ini ikut gagal
+            hasil = [(False, e)] * len(batch)
+        for (_, _, _, future), (ok, nilai) in zip(batch, hasil):
+            if ok:
+                future.set_result(nilai)
+            else:
+                future.set_exception(nilai)
+
+
+penulis = PenulisTunggal()
+
+
+def tulis(fungsi, *args, **kwargs):
+    """
+    fungsi(*args, **kwargs) lewat antrian penulis kalau SQLITE_WRITE_QUEUE aktif,
+    selain itu langsung di thread pemanggil.
+    """
+    if settings.SQLITE_WRITE_QUEUE:
+        return penulis.jalankan(fungsi, *args, **kwargs)
+    return fungsi(*args, **kwargs)
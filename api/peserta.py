@@ -0,0 +1,263 @@
+import codecs
+import csv
+import random
+import re
+import string
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Max
+from django.db.models.functions import Cast, Substr
+
+from .ballot import buat_kode, digest_kode
+from .models import BallotCode
+from .penulis import tulis
+from .turnout import tambah_peserta
+
+User = get_user_model()
+
+# Lebar minimal nomor urut username, sama dengan format lama prefix + 5 digit
+LEBAR_NOMOR = 5
+PERCOBAAN_ALOKASI = 3
+# Import CSV: laporan error per baris dibatasi supaya file rusak tidak menghasilkan response raksasa
+IMPOR_MAKS_ERROR = 1000
+# Import CSV: password awal acak dikembalikan di response JSON, jadi dibatasi seperti
+# generate fmt=json; import lebih besar wajib membawa kolom password
+IMPOR_MAKS_PASSWORD_ACAK = 500
+POLA_USERNAME = re.compile(r'^[\w.@+-]+$')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    # Start method "spawn" (Windows/macOS) memulai interpreter kosong
+    django.setup()
+
+
+def pool_hash():
+    """
+    Process pool PESERTA_HASH_WORKERS milik proses ini, dipakai bersama semua
+    generate/import (tidak fork per request). Pool & proses worker-nya dibuat
+    saat pertama dipakai. None kalau 1 worker.
+    """
+    global _pool
+    if settings.PESERTA_HASH_WORKERS <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.PESERTA_HASH_WORKERS, initializer=_init_worker)
+        return _pool
+
+
+def hash_passwords(passwords, pool=None):
+    """
+    Hash banyak password sekaligus. Kalau jumlahnya besar, hashing (PBKDF2,
+    CPU-bound) dibagi ke `pool` (lihat pool_hash).
+    """
+    hasher = partial(make_password, hasher=settings.PESERTA_PASSWORD_HASHER)
+    if pool is None or len(passwords) < settings.PESERTA_HASH_POOL_MIN:
+        return [hasher(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (settings.PESERTA_HASH_WORKERS * 4))
+    return list(pool.map(hasher, passwords, chunksize=chunksize))
+
+
+def nomor_terakhir(prefix):
+    """
+    Nomor terbesar yang sudah dipakai username berbentuk prefix + digit.
+    """
+    digit = 18  # muat di BIGINT
+    hasil = (User.objects.filter(username__regex=rf'^{re.escape(prefix)}[0-9]{{1,{digit}}}$')
+                 .annotate(nomor=Cast(Substr('username', len(prefix) + 1), BigIntegerField()))
+                 .aggregate(terakhir=Max('nomor')))
+    return hasil['terakhir'] or 0
+
+
+def alokasi_username(prefix, jumlah):
+    """
+    Username berurutan setelah nomor terbesar yang sudah ada untuk prefix ini.
+    Nomor baru selalu lebih besar dari semua nomor lama, jadi tidak bisa bentrok
+    dengan username yang sudah ada (beda dengan suffix acak).
+    """
+    mulai = nomor_terakhir(prefix) + 1
+    lebar = max(LEBAR_NOMOR, len(str(mulai + jumlah - 1)))
+    return [f"{prefix}{n:0{lebar}d}" for n in range(mulai, mulai + jumlah)]
+
+
+def password_acak():
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=8))
+
+
+def buat_peserta_massal(admin, jumlah, prefix, mode='password'):
+    """
+    Buat `jumlah` peserta milik `admin` dengan bulk_create dalam satu transaksi.
+    Return list (username, rahasia) plaintext untuk dibagikan ke peserta:
+    password awal (mode='password') atau kode ballot sekali pakai (mode='ballot_code').
+    """
+    if mode == 'ballot_code':
+        # Login lewat kode (HMAC), jadi tidak ada password yang perlu di-hash
+        rahasia = [buat_kode() for _ in range(jumlah)]
+        hashes = [make_password(None)] * jumlah
+    else:
+        rahasia = [password_acak() for _ in range(jumlah)]
+        hashes = hash_passwords(rahasia, pool_hash())
+
+    # Hashing (CPU) tetap di thread pemanggil; hanya insert yang lewat antrian penulis
+    return tulis(_simpan_peserta_massal, admin, prefix, mode, rahasia, hashes)
+
+
+def buat_peserta_bertahap(admin, jumlah, prefix, mode='password'):
+    """
+    Seperti buat_peserta_massal, tapi generator untuk response streaming: tiap
+    PESERTA_BATCH_SIZE akun di-hash, di-insert (transaksi sendiri) lalu langsung
+    di-yield, jadi byte pertama tidak menunggu seluruh `jumlah` selesai.
+    Client putus di tengah = batch berikutnya tidak dibuat.
+    """
+    while jumlah > 0:
+        n = min(jumlah, settings.PESERTA_BATCH_SIZE)
+        yield from buat_peserta_massal(admin, n, prefix, mode)
+        jumlah -= n
+
+
+def _simpan_peserta_massal(admin, prefix, mode, rahasia, hashes):
+    jumlah = len(rahasia)
+    for percobaan in range(PERCOBAAN_ALOKASI):
+        usernames = alokasi_username(prefix, jumlah)
+        users = [
+            User(
+                username=username,
+                password=hashed,
+                is_app_admin=False,
+                is_participant=True,
+                admin_owner=admin,
+                must_change_password=(mode == 'password'),
+            )
+            for username, hashed in zip(usernames, hashes)
+        ]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users, batch_size=settings.PESERTA_BATCH_SIZE)
+                tambah_peserta(admin.id, len(users))
+                if mode == 'ballot_code':
+                    BallotCode.objects.bulk_create(
+                        [BallotCode(peserta=u, digest=digest_kode(kode)) for u, kode in zip(users, rahasia)],
+                        batch_size=settings.PESERTA_BATCH_SIZE,
+                    )
+        except IntegrityError:
+            # Request lain dengan prefix sama mengambil nomor yang sama; alokasi ulang
+            if percobaan == PERCOBAAN_ALOKASI - 1:
+                raise
+            continue
+        return list(zip(usernames, rahasia))
+
+
+def _simpan_batch_impor(admin, batch, hasil, pool):
+    """
+    Insert satu batch baris (line, username, password) yang lolos validasi format.
+    Username yang sudah ada di DB (termasuk dari batch sebelumnya, atau dibuat
+    request lain bersamaan) dilaporkan per baris. Baris tanpa password dapat
+    password awal acak yang dikembalikan di hasil["accounts"], seperti generate.
+    """
+    sudah_ada = set(User.objects.filter(username__in=[u for _, u, _ in batch]).values_list('username', flat=True))
+    baru = [(line, username, password) for line, username, password in batch if username not in sudah_ada]
+    dibuat = {username: password_acak() for _, username, password in baru if not password}
+    hashes = hash_passwords([password or dibuat[username] for _, username, password in baru], pool)
+    users = [
+        User(
+            username=username,
+            password=hashed,
+            is_app_admin=False,
+            is_participant=True,
+            admin_owner=admin,
+            must_change_password=True,
+        )
+        for (_, username, _), hashed in zip(baru, hashes)
+    ]
+    masuk = tulis(_insert_impor, admin, users) if users else set()
+
+    for line, username, _ in batch:
+        if username not in masuk:
+            _catat_error_impor(hasil, line, username, "Username sudah dipakai.")
+    hasil['created'] += len(masuk)
+    hasil['accounts'] += [{"username": u, "password": p} for u, p in dibuat.items() if u in masuk]
+
+
+def _insert_impor(admin, users):
+    """
+    bulk_create satu batch dalam satu transaksi. Username yang keburu dibuat
+    import/generate lain di antara pengecekan dan insert dibuang, lalu batch
+    diulang. Return set username yang masuk.
+    """
+    while users:
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users, batch_size=settings.PESERTA_BATCH_SIZE)
+                tambah_peserta(admin.id, len(users))
+        except IntegrityError:
+            bentrok = set(User.objects.filter(username__in=[u.username for u in users])
+                          .values_list('username', flat=True))
+            if not bentrok:
+                raise
+            users = [u for u in users if u.username not in bentrok]
+            continue
+        return {u.username for u in users}
+    return set()
+
+
+def _catat_error_impor(hasil, line, username, pesan):
+    hasil['error_count'] += 1
+    if len(hasil['errors']) < IMPOR_MAKS_ERROR:
+        hasil['errors'].append({"line": line, "username": username, "error": pesan})
+
+
+def impor_peserta_csv(admin, baris_bytes):
+    """
+    Import peserta milik `admin` dari CSV (header: username[,password]).
+    Password kosong -> password awal acak, dikembalikan di "accounts" (maks
+    IMPOR_MAKS_PASSWORD_ACAK baris, sisanya ditolak per baris). `baris_bytes` iterable baris mentah (upload / body request), diproses
+    bertahap per PESERTA_BATCH_SIZE baris: memori tidak tumbuh dengan ukuran file.
+    Baris yang gagal dilewati dan dilaporkan; batch yang valid tetap tersimpan.
+    """
+    hasil = {"created": 0, "error_count": 0, "errors": [], "accounts": []}
+    reader = csv.reader(codecs.iterdecode(baris_bytes, 'utf-8-sig'))
+    header = [h.strip().lower() for h in next(reader, [])]
+    if 'username' not in header:
+        raise ValueError("Header CSV wajib punya kolom 'username'.")
+    i_user = header.index('username')
+    i_pass = header.index('password') if 'password' in header else None
+
+    batch, dilihat, tanpa_password = [], set(), 0
+    pool = pool_hash()
+    for row in reader:
+        if not any(c.strip() for c in row):
+            continue
+        line = reader.line_num
+        username = row[i_user].strip() if i_user < len(row) else ''
+        password = row[i_pass] if i_pass is not None and i_pass < len(row) else ''
+        if not username or len(username) > 150 or not POLA_USERNAME.match(username):
+            _catat_error_impor(hasil, line, username, "Username tidak valid (maks 150, huruf/angka/@/./+/-/_).")
+            continue
+        if username in dilihat:
+            _catat_error_impor(hasil, line, username, "Username ganda di file.")
+            continue
+        if not password:
+            if tanpa_password >= IMPOR_MAKS_PASSWORD_ACAK:
+                _catat_error_impor(hasil, line, username, f"Password wajib diisi: maks {IMPOR_MAKS_PASSWORD_ACAK} "
+                                   "baris tanpa password per import (gunakan generate-peserta untuk jumlah besar).")
+                continue
+            tanpa_password += 1
+        dilihat.add(username)
+        batch.append((line, username, password))
+        if len(batch) >= settings.PESERTA_BATCH_SIZE:
+            _simpan_batch_impor(admin, batch, hasil, pool)
+            # duplikat lintas batch sudah tertangkap DB, cukup ingat batch berjalan
+            batch, dilihat = [], set()
+    if batch:
+        _simpan_batch_impor(admin, batch, hasil, pool)
+    return hasil
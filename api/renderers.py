@@ -0,0 +1,33 @@
+"""
+Renderer JSON cepat untuk response API. Pakai orjson kalau terpasang
+(`pip install orjson`, opsional); tanpa itu sama persis dengan JSONRenderer DRF.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson opsional
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Output sama dengan JSONRenderer (compact, UTF-8). Tipe yang tidak dikenal
+    orjson (datetime, Decimal, UUID, lazy string, ...) tetap diformat encoder
+    DRF, jadi format tanggal tidak berubah ("...Z").
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # ?indent / Accept: ...; indent=N untuk debug: jalur biasa
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson.dumps(data, default=_encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            # mis. integer > 64 bit
+            return super().render(data, accepted_media_type, renderer_context)
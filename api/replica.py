@@ -0,0 +1,101 @@
+"""
+Routing baca ke read replica (DATABASE_REPLICA_URLS).
+
+Default semua query tetap ke primary. Hanya blok `with baca_replika(request)`
+(hasil, daftar kandidat, daftar peserta, export) yang membaca dari replica,
+kecuali pemohonnya baru saja menulis: ReplicaPinMiddleware menandai principal
+itu selama REPLICA_STICKY_SECONDS supaya dia langsung melihat tulisannya
+sendiri (read-your-writes) walaupun replica masih tertinggal.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+
+from .admission import principal
+
+_alias_baca = ContextVar('replika_alias_baca', default=None)
+# dict per request, diisi router saat ada query tulis
+_request_state = ContextVar('replika_request_state', default=None)
+
+
+def _key_pin(jenis, ident):
+    return f"replika:pin:{jenis}:{ident}"
+
+
+def alias_baca(request):
+    """
+    Alias DB untuk bacaan request ini: replica acak, atau 'default' kalau
+    tidak ada replica / pemohon baru saja menulis.
+    """
+    if not settings.DATABASE_REPLICAS:
+        return 'default'
+    jenis, ident = principal(request)
+    if jenis != 'anon' and cache.get(_key_pin(jenis, ident)):
+        return 'default'
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def baca_replika(request):
+    token = _alias_baca.set(alias_baca(request))
+    try:
+        yield
+    finally:
+        _alias_baca.reset(token)
+
+
+def sedang_baca_replika():
+    alias = _alias_baca.get()
+    return alias is not None and alias != 'default'
+
+
+class ReplicaRouter:
+    """
+    Baca: replica yang dipilih baca_replika(), selain itu primary. Tulis & migrate: primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _alias_baca.get()
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state['tulis'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica = salinan primary, relasi antar alias aman
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == 'default'
+
+
+class ReplicaPinMiddleware:
+    """
+    Request yang menulis ke primary (vote, ganti password, generate, ...) ->
+    principal-nya dibaca dari primary selama REPLICA_STICKY_SECONDS.
+    Dilepas saat startup kalau tidak ada replica.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = {'tulis': False}
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state['tulis']:
+            jenis, ident = principal(request)
+            if jenis != 'anon':
+                cache.set(_key_pin(jenis, ident), True, settings.REPLICA_STICKY_SECONDS)
+        return response
@@ -1,8 +1,14 @@
+from django.conf import settings
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.validators import RegexValidator
 from django.utils.timezone import localtime
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from .authentication import cek_versi_token, klaim_untuk
+from .cache import versi_token
 from .models import Kandidat, Vote
 
 User = get_user_model()
@@ -29,8 +35,36 @@ class RegisterAdminSerializer(serializers.Serializer):
 
 
 class GeneratePesertaSerializer(serializers.Serializer):
-    jumlah = serializers.IntegerField(min_value=1, max_value=500)
-    prefix = serializers.CharField(max_length=30, required=False, allow_blank=True)
+    # Response JSON dibatasi 500 akun; jumlah besar diunduh sebagai CSV/NDJSON (streaming)
+    MAKS_JSON = 500
+
+    jumlah = serializers.IntegerField(min_value=1, max_value=100_000)
+    prefix = serializers.CharField(
+        max_length=30, required=False, allow_blank=True,
+        validators=[RegexValidator(r'^[\w.@+-]*$', message="Hanya huruf, angka, dan @/./+/-/_")]
+    )
+    fmt = serializers.ChoiceField(choices=['json', 'csv', 'ndjson'], default='json')
+    # password: username+password, wajib ganti password saat login pertama
+    # ballot_code: kode sekali pakai untuk /api/token/ballot/, tanpa password
+    mode = serializers.ChoiceField(choices=['password', 'ballot_code'], default='password')
+
+    def validate(self, data):
+        if data['fmt'] == 'json' and data['jumlah'] > self.MAKS_JSON:
+            raise serializers.ValidationError(
+                {"jumlah": f"Maksimal {self.MAKS_JSON} untuk fmt=json, gunakan fmt=csv atau fmt=ndjson."}
+            )
+        return data
+
+
+class BallotBatchSerializer(serializers.Serializer):
+    # isi tiap ballot divalidasi per ballot di api/ballot.py (ditolak satu-satu, bukan 400 semua)
+    ballots = serializers.ListField(allow_empty=False)
+    signature = serializers.CharField(max_length=128)
+
+    def validate_ballots(self, value):
+        if len(value) > settings.BALLOT_BATCH_MAX:
+            raise serializers.ValidationError(f"Maksimal {settings.BALLOT_BATCH_MAX} ballot per batch.")
+        return value
 
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -43,6 +77,46 @@ class ChangePasswordSerializer(serializers.Serializer):
         return data
 
 
+class VotingTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Login biasa, tapi role & admin_owner_id ikut jadi klaim JWT supaya jalur baca
+    tidak perlu query User (lihat ClaimsJWTAuthentication).
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for nama, nilai in klaim_untuk(user).items():
+            token[nama] = nilai
+        return token
+
+
+class VotingTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs['refresh'])
+        user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is not None:
+            cek_versi_token(refresh, versi_token(int(user_id)))
+        return super().validate(attrs)
+
+
+def token_baru(user):
+    refresh = VotingTokenObtainPairSerializer.get_token(user)
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+def token_ballot(user):
+    """
+    Access token berumur pendek dengan scope "vote" untuk login kode ballot (tanpa refresh token).
+    """
+    token = AccessToken.for_user(user)
+    token.set_exp(lifetime=settings.BALLOT_TOKEN_LIFETIME)
+    for nama, nilai in klaim_untuk(user).items():
+        token[nama] = nilai
+    token['scope'] = 'vote'
+    return str(token)
+
+
 class MeSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -63,7 +137,9 @@ class PesertaSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'must_change_password', 'date_joined', 'sudah_vote']
 
     def get_sudah_vote(self, obj):
-        # Mengecek apakah ada record Vote yang berelasi dengan user ini
+        # Pakai anotasi Exists dari queryset kalau ada, supaya tidak query per baris
+        if hasattr(obj, 'sudah_vote'):
+            return obj.sudah_vote
         return Vote.objects.filter(voter=obj).exists()
 
     def get_date_joined(self, obj):
@@ -81,13 +157,31 @@ class KandidatCreateUpdateSerializer(serializers.ModelSerializer):
         fields = ['id', 'nama', 'visi', 'misi', 'foto_url']
 
 
-class KandidatListSerializer(serializers.ModelSerializer):
-    total_votes = serializers.IntegerField(read_only=True, source='votes__count')
+class SparseFieldsMixin:
+    """
+    Batasi field output ke context['fields'] (dari ?fields=) kalau ada.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields:
+            for nama in set(self.fields) - set(fields):
+                self.fields.pop(nama)
+
+
+class KandidatListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # dari anotasi tally.total_votes(); 0 kalau queryset tidak dianotasi
+    total_votes = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
         model = Kandidat
         fields = ['id', 'nama', 'visi', 'misi', 'foto_url', 'total_votes', 'created_at']
 
 
+class BallotLoginSerializer(serializers.Serializer):
+    code = serializers.CharField(max_length=64)
+
+
 class VoteCreateSerializer(serializers.Serializer):
     kandidat_id = serializers.IntegerField()
\ No newline at end of file
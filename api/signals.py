@@ -0,0 +1,145 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import katalog_cache, lupakan_final, lupakan_katalog, lupakan_versi_token
+from . import tally, turnout
+from .hasil import hasil_berubah
+from .models import HasilFinal, Kandidat, User, Vote
+
+
+def _admin_id_vote(vote):
+    if Vote.kandidat.is_cached(vote):
+        return vote.kandidat.admin_owner_id
+    return Kandidat.objects.filter(pk=vote.kandidat_id).values_list('admin_owner_id', flat=True).first()
+
+
+def _model_asal(origin):
+    """
+    Model asal penghapusan (instance atau queryset yang .delete()-nya dipanggil).
+    """
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def _kurangi_vote(kandidat_id, voter_id, waktu, admin_id):
+    tally.kurangi(kandidat_id, voter_id)
+    if admin_id is not None:
+        turnout.kurangi_vote(admin_id, voter_id, waktu)
+    hasil_berubah(admin_id)
+
+
+# ========================
+# Tally suara per kandidat
+# ========================
+
+@receiver(post_save, sender=Vote)
+def tambah_tally(sender, instance, created, **kwargs):
+    """
+    Vote baru -> tally kandidat +1 (shard milik peserta) dan rollup turnout per menit,
+    dalam transaksi yang sama dengan insert.
+    """
+    if created:
+        tally.tambah(instance.kandidat_id, instance.voter_id)
+        admin_id = _admin_id_vote(instance)
+        if admin_id is not None:
+            turnout.tambah_vote(admin_id, instance.voter_id, instance.created_at)
+        hasil_berubah(admin_id)
+
+
+@receiver(post_delete, sender=Vote)
+def kurangi_tally(sender, instance, origin=None, **kwargs):
+    """
+    Vote dihapus langsung -> tally -1. Vote yang ikut terhapus bersama
+    kandidat/peserta/admin sudah diurus sekaligus oleh pre_delete induknya.
+    """
+    if _model_asal(origin) is not Vote:
+        return
+    _kurangi_vote(instance.kandidat_id, instance.voter_id, instance.created_at, _admin_id_vote(instance))
+
+
+@receiver(pre_delete, sender=Kandidat)
+def kurangi_tally_kandidat(sender, instance, origin=None, **kwargs):
+    """
+    Kandidat dihapus: shard tally-nya ikut terhapus, rollup turnout dikurangi per
+    (menit, shard). Kalau admin-nya yang dihapus, rollup admin ikut terhapus juga.
+    """
+    if _model_asal(origin) is Kandidat:
+        turnout.kurangi_vote_kandidat(instance.admin_owner_id, instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def kurangi_tally_peserta(sender, instance, **kwargs):
+    """
+    Peserta dihapus -> vote-nya (maksimal satu) dikurangi dari tally & rollup.
+    """
+    if not instance.is_participant:
+        return
+    vote = (Vote.objects.filter(voter_id=instance.pk)
+                .values_list('kandidat_id', 'created_at', 'kandidat__admin_owner_id').first())
+    if vote is not None:
+        kandidat_id, waktu, admin_id = vote
+        _kurangi_vote(kandidat_id, instance.pk, waktu, admin_id)
+
+
+# ========================
+# Versi hasil & live stream
+# ========================
+
+@receiver(post_save, sender=Kandidat)
+@receiver(post_delete, sender=Kandidat)
+def kandidat_berubah(sender, instance, **kwargs):
+    """
+    Kandidat ditambah/diubah/dihapus -> hasil & daftar kandidat admin ini berubah.
+    """
+    if kwargs.get('created'):
+        tally.siapkan_shard(instance.pk)
+    admin_id = instance.admin_owner_id
+    transaction.on_commit(lambda: lupakan_katalog(admin_id))
+    hasil_berubah(admin_id)
+
+
+@receiver(post_save, sender=HasilFinal)
+@receiver(post_delete, sender=HasilFinal)
+def hasil_final_berubah(sender, instance, **kwargs):
+    """
+    Voting ditutup -> hasil & kandidat dilayani dari snapshot final.
+    """
+    admin_id = instance.admin_id
+    transaction.on_commit(lambda: lupakan_final(admin_id))
+    hasil_berubah(admin_id)
+
+
+# ========================
+# Jumlah peserta (turnout)
+# ========================
+
+@receiver(post_save, sender=User)
+def peserta_dibuat(sender, instance, created, **kwargs):
+    # generate/import massal lewat bulk_create menambah sendiri (api/peserta.py)
+    if created and instance.is_participant and instance.admin_owner_id:
+        turnout.tambah_peserta(instance.admin_owner_id)
+
+
+@receiver(post_delete, sender=User)
+def peserta_dihapus(sender, instance, **kwargs):
+    if instance.is_participant and instance.admin_owner_id:
+        turnout.kurangi_peserta(instance.admin_owner_id)
+
+
+# ========================
+# Versi token JWT
+# ========================
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_berubah(sender, instance, **kwargs):
+    """
+    User diubah/dihapus -> versi token di cache dibaca ulang dari DB
+    (user terhapus/nonaktif = semua tokennya ditolak ClaimsJWTAuthentication).
+    """
+    user_id = instance.pk
+    transaction.on_commit(lambda: lupakan_versi_token(user_id))
+    if instance.is_app_admin:
+        # username admin -> id ter-cache untuk akses publik ?admin=USERNAME
+        transaction.on_commit(katalog_cache.reset_admin)
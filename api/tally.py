@@ -0,0 +1,94 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+
+from .models import VoteTally
+
+
+def jumlah_shard():
+    return max(1, settings.VOTE_TALLY_SHARDS)
+
+
+def shard_untuk(voter_id):
+    """
+    Shard dipilih dari id peserta: vote bersamaan tersebar rata, dan vote yang
+    dihapus mengurangi shard yang sama dengan saat ditambahkan.
+    """
+    return voter_id % jumlah_shard()
+
+
+def siapkan_shard(kandidat_id):
+    """
+    Buat semua baris shard kandidat baru di depan, supaya vote pertama di tiap
+    shard cukup satu UPDATE (tanpa savepoint + INSERT).
+    """
+    VoteTally.objects.bulk_create(
+        [VoteTally(kandidat_id=kandidat_id, shard=i) for i in range(jumlah_shard())],
+        ignore_conflicts=True,
+    )
+
+
+def tambah(kandidat_id, voter_id, n=1):
+    """
+    Tally kandidat +n di shard milik peserta. Baris shard yang belum ada (kandidat
+    lama, atau VOTE_TALLY_SHARDS dinaikkan) dibuat saat pertama dipakai.
+    """
+    _tambah_shard(kandidat_id, shard_untuk(voter_id), n)
+
+
+def tambah_banyak(pasangan):
+    """
+    Tally untuk banyak vote sekaligus (upload batch): `pasangan` = (kandidat_id, voter_id).
+    Satu UPDATE per (kandidat, shard), bukan per vote.
+    """
+    jumlah = Counter((kandidat_id, shard_untuk(voter_id)) for kandidat_id, voter_id in pasangan)
+    for (kandidat_id, shard), n in sorted(jumlah.items()):
+        _tambah_shard(kandidat_id, shard, n)
+
+
+def _tambah_shard(kandidat_id, shard, n):
+    baris = VoteTally.objects.filter(kandidat_id=kandidat_id, shard=shard)
+    if baris.update(total=F('total') + n):
+        return
+    try:
+        with transaction.atomic():
+            VoteTally.objects.create(kandidat_id=kandidat_id, shard=shard, total=n)
+    except IntegrityError:
+        # shard yang sama baru saja dibuat vote lain
+        baris.update(total=F('total') + n)
+
+
+def kurangi(kandidat_id, voter_id):
+    """
+    Tally kandidat -1. Kalau shard peserta sudah 0 (mis. VOTE_TALLY_SHARDS diganti
+    setelah vote masuk), kurangi shard lain yang masih berisi.
+    """
+    qs = VoteTally.objects.filter(kandidat_id=kandidat_id, total__gt=0)
+    if qs.filter(shard=shard_untuk(voter_id)).update(total=F('total') - 1):
+        return
+    pk = qs.order_by('shard').values_list('pk', flat=True).first()
+    if pk is not None:
+        VoteTally.objects.filter(pk=pk, total__gt=0).update(total=F('total') - 1)
+
+
+def total_votes():
+    """
+    Ekspresi anotasi total suara untuk queryset Kandidat.
+    """
+    return Coalesce(Sum('tally_shards__total'), 0)
+
+
+def total_per_kandidat(admin_id):
+    """
+    {kandidat_id: total} untuk semua kandidat admin yang punya suara.
+    """
+    rows = (VoteTally.objects.filter(kandidat__admin_owner_id=admin_id)
+                .values('kandidat_id').annotate(t=Sum('total')).values_list('kandidat_id', 't'))
+    return dict(rows)
+
+
+def total_kandidat(kandidat_id):
+    return VoteTally.objects.filter(kandidat_id=kandidat_id).aggregate(t=Coalesce(Sum('total'), 0))['t']
@@ -1,3 +1,1351 @@
-from django.test import TestCase
+import asyncio
+import tempfile
+import threading
+import time
+import csv
+import json
+import os
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, router, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import ballot as ballot_mod
+from . import peserta as peserta_mod
+from . import turnout
+from .admission import principal
+from .ballot import tanda_tangan_batch
+from .bench import bandingkan, persentil
+from .cache import LRUCache, admin_id_untuk, katalog_cache, katalog_kandidat
+from .idempotency import IdempotencyStore, store as idempotency_store
+from .live import broadcaster
+from .metrics import store as metrics_store, tandai_proses_mati
+from .penulis import penulis
+from .renderers import FastJSONRenderer
+from .replica import alias_baca, baca_replika
+from .hasil import daftar_kandidat, hasil_final
+from .models import BallotCode, HasilFinal, Kandidat, Vote, VoteMenit, VoteTally
+from .serializers import KandidatListSerializer, token_baru
+from .tally import jumlah_shard, total_kandidat, total_votes
+
+User = get_user_model()
+
+
+class VotingTestMixin:
+    """
+    Helper data: satu admin, beberapa kandidat, beberapa peserta.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        katalog_cache.lru.clear()
+        idempotency_store.clear()
+
+    def buat_admin(self, username='admin1'):
+        return User.objects.create_user(username=username, password=None, is_app_admin=True)
+
+    def buat_peserta(self, admin, username):
+        return User.objects.create_user(
+            username=username, password=None,
+            is_participant=True, admin_owner=admin, must_change_password=True,
+        )
+
+    def client_for(self, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        return client
+
+
+class TallyTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.k1 = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.k2 = Kandidat.objects.create(admin_owner=self.admin, nama='Budi')
+        self.peserta = [self.buat_peserta(self.admin, f'p{i}') for i in range(3)]
+
+    def test_vote_menambah_tally(self):
+        for p in self.peserta[:2]:
+            res = self.client_for(p).post('/api/vote/', {'kandidat_id': self.k1.id}, format='json')
+            self.assertEqual(res.status_code, 201)
+        self.client_for(self.peserta[2]).post('/api/vote/', {'kandidat_id': self.k2.id}, format='json')
+
+        self.assertEqual(total_kandidat(self.k1.id), 2)
+        res = self.client_for().get('/api/hasil/', {'admin': 'admin1'})
+        self.assertEqual(res.json(), [{'kandidat': 'Andi', 'total': 2}, {'kandidat': 'Budi', 'total': 1}])
+
+    def test_vote_kandidat_tidak_ada_atau_admin_lain(self):
+        lain = Kandidat.objects.create(admin_owner=self.buat_admin('admin2'), nama='Cici')
+        client = self.client_for(self.peserta[0])
+        res = client.post('/api/vote/', {'kandidat_id': lain.id}, format='json')
+        self.assertEqual((res.status_code, res.json()), (403, {"error": "Anda tidak berhak memilih kandidat ini."}))
+        Kandidat.objects.filter(id=lain.id).delete()
+        res = client.post('/api/vote/', {'kandidat_id': lain.id}, format='json')
+        self.assertEqual((res.status_code, res.json()), (404, {"error": "Kandidat tidak ditemukan."}))
+        self.assertFalse(Vote.objects.filter(voter=self.peserta[0]).exists())
+
+    def test_integrity_error_lain_bukan_sudah_vote(self):
+        # belum vote & kandidat masih ada: bukan "sudah vote", error diteruskan
+        with mock.patch.object(Vote.objects, 'create', side_effect=IntegrityError('lain')):
+            with self.assertRaises(IntegrityError):
+                self.client_for(self.peserta[0]).post('/api/vote/', {'kandidat_id': self.k1.id}, format='json')
+
+    def test_hapus_peserta_mengurangi_tally(self):
+        Vote.objects.create(voter=self.peserta[0], kandidat=self.k1)
+        Vote.objects.create(voter=self.peserta[1], kandidat=self.k1)
+        res = self.client_for(self.admin).delete(f'/api/peserta/{self.peserta[0].id}/')
+        self.assertEqual(res.status_code, 204)
+        self.assertEqual(total_kandidat(self.k1.id), 1)
+
+    def test_kandidat_list_membaca_tally(self):
+        Vote.objects.create(voter=self.peserta[0], kandidat=self.k2)
+        res = self.client_for(self.admin).get('/api/kandidat/')
+        totals = {r['nama']: r['total_votes'] for r in res.json()['results']}
+        self.assertEqual(totals, {'Andi': 0, 'Budi': 1})
+
+    def test_rebuild_tally(self):
+        Vote.objects.create(voter=self.peserta[0], kandidat=self.k1)
+        VoteTally.objects.filter(kandidat=self.k1).update(total=7)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_tally', '--check', stdout=StringIO())
+        call_command('rebuild_tally', stdout=StringIO())
+        call_command('rebuild_tally', '--check', stdout=StringIO())
+        self.assertEqual(total_kandidat(self.k1.id), 1)
+
+    @override_settings(VOTE_TALLY_SHARDS=2)
+    def test_tally_tersebar_di_shard(self):
+        for p in self.peserta:
+            Vote.objects.create(voter=p, kandidat=self.k1)
+        self.assertEqual(VoteTally.objects.filter(kandidat=self.k1, total__gt=0).count(), 2)
+        self.assertEqual(total_kandidat(self.k1.id), 3)
+
+        # jumlah shard diganti setelah vote masuk: hapus vote tetap mengurangi tally
+        with self.settings(VOTE_TALLY_SHARDS=5):
+            self.peserta[1].delete()
+            self.peserta[2].delete()
+        self.assertEqual(total_kandidat(self.k1.id), 1)
+        res = self.client_for(self.admin).get(f'/api/kandidat/{self.k1.id}/')
+        self.assertEqual(res.json()['total_votes'], 1)
+
+
+class SQLiteProduksiMixin:
+    """
+    Test konkurensi memakai mode produksi SQLite (SQLITE_WAL, lihat settings.py):
+    tanpa IMMEDIATE, transaksi yang naik dari baca ke tulis langsung "database is locked".
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._options_lama = connection.settings_dict.get('OPTIONS', {})
+        if connection.vendor == 'sqlite':
+            connection.close()
+            connection.settings_dict['OPTIONS'] = settings.SQLITE_OPTIONS_PRODUKSI
+
+    @classmethod
+    def tearDownClass(cls):
+        connection.close()
+        connection.settings_dict['OPTIONS'] = cls._options_lama
+        super().tearDownClass()
+
+
+class VoteConcurrencyTests(SQLiteProduksiMixin, VotingTestMixin, TransactionTestCase):
+    THREADS = 16
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.peserta = self.buat_peserta(self.admin, 'p1')
+
+    def test_double_submit_bersamaan_tercatat_sekali(self):
+        barrier = threading.Barrier(self.THREADS)
+        statuses = []
+
+        def kirim():
+            client = self.client_for(self.peserta)
+            barrier.wait()
+            try:
+                res = client.post('/api/vote/', {'kandidat_id': self.kandidat.id}, format='json')
+                statuses.append(res.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=kirim) for _ in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(sorted(statuses), [201] + [400] * (self.THREADS - 1))
+        self.assertEqual(Vote.objects.filter(voter=self.peserta).count(), 1)
+        self.assertEqual(total_kandidat(self.kandidat.id), 1)
+
+    @override_settings(VOTE_TALLY_SHARDS=4)
+    def test_banyak_peserta_bersamaan_satu_kandidat(self):
+        peserta = [self.buat_peserta(self.admin, f'q{i}') for i in range(self.THREADS * 4)]
+        barrier = threading.Barrier(self.THREADS)
+        statuses = []
+
+        def kirim(bagian):
+            barrier.wait()
+            try:
+                for p in bagian:
+                    res = self.client_for(p).post('/api/vote/', {'kandidat_id': self.kandidat.id}, format='json')
+                    statuses.append(res.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=kirim, args=(peserta[i::self.THREADS],)) for i in range(self.THREADS)]
+        mulai = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        durasi = time.perf_counter() - mulai
+
+        self.assertEqual(statuses, [201] * len(peserta))
+        self.assertEqual(total_kandidat(self.kandidat.id), len(peserta))
+        self.assertEqual(VoteTally.objects.filter(kandidat=self.kandidat, total__gt=0).count(), 4)
+        self.assertLess(durasi, 30, f"{len(peserta)} vote bersamaan butuh {durasi:.1f}s")
+
+    def test_sudah_vote_tetap_400(self):
+        client = self.client_for(self.peserta)
+        self.assertEqual(client.post('/api/vote/', {'kandidat_id': self.kandidat.id}, format='json').status_code, 201)
+        res = client.post('/api/vote/', {'kandidat_id': self.kandidat.id}, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json(), {"error": "Anda sudah melakukan vote."})
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class JWTClaimsTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.peserta = self.buat_peserta(self.admin, 'p1')
+        self.peserta.set_password('rahasia-123')
+        self.peserta.save()
+
+    def login(self, username='p1', password='rahasia-123'):
+        res = APIClient().post('/api/token/', {'username': username, 'password': password}, format='json')
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def client_token(self, access):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return client
+
+    def test_jalur_baca_tanpa_query_user(self):
+        client = self.client_token(self.login()['access'])
+        client.get('/api/me/')  # isi cache versi token
+        with self.assertNumQueries(0):
+            res = client.get('/api/me/')
+        self.assertEqual(res.json(), {
+            'id': self.peserta.id, 'username': 'p1', 'is_app_admin': False,
+            'is_participant': True, 'must_change_password': True,
+        })
+        # hasil: hanya cek voting ditutup + query tally, tanpa SELECT user
+        with self.assertNumQueries(2):
+            self.assertEqual(client.get('/api/hasil/').json(), [{'kandidat': 'Andi', 'total': 0}])
+
+    def test_ganti_password_membatalkan_token_lama(self):
+        tokens = self.login()
+        lama = self.client_token(tokens['access'])
+        self.assertEqual(lama.get('/api/me/').status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = lama.post('/api/change-password/', {'new_password': 'Sandi-Baru-2024'}, format='json')
+        self.assertEqual(res.status_code, 200)
+        baru = self.client_token(res.json()['access'])
+
+        self.assertEqual(lama.get('/api/me/').status_code, 401)
+        self.assertEqual(lama.get('/api/kandidat/').status_code, 401)
+        res = APIClient().post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(res.status_code, 401)
+
+        res = baru.get('/api/me/')
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(res.json()['must_change_password'])
+
+    def test_peserta_dihapus_tokennya_ditolak(self):
+        client = self.client_token(self.login()['access'])
+        self.assertEqual(client.get('/api/hasil/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client_for(self.admin).delete(f'/api/peserta/{self.peserta.id}/')
+        self.assertEqual(client.get('/api/hasil/').status_code, 401)
+
+
+@override_settings(SQLITE_WRITE_QUEUE=True, SQLITE_WRITE_WAIT_MS=20)
+class WriteQueueTests(VotingTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+
+    def tearDown(self):
+        penulis.berhenti()
+        super().tearDown()
+
+    def test_vote_bersamaan_lewat_penulis_tunggal(self):
+        peserta = [self.buat_peserta(self.admin, f'q{i}') for i in range(12)]
+        statuses = []
+
+        def kirim(p):
+            try:
+                res = self.client_for(p).post('/api/vote/', {'kandidat_id': self.kandidat.id}, format='json')
+                statuses.append(res.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=kirim, args=(p,)) for p in peserta + peserta[:3]]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # vote ganda di batch yang sama: hanya savepoint vote itu yang gagal
+        self.assertEqual(sorted(statuses), [201] * 12 + [400] * 3)
+        self.assertEqual(total_kandidat(self.kandidat.id), 12)
+
+    def test_generate_peserta_lewat_penulis(self):
+        res = self.client_for(self.admin).post('/api/generate-peserta/', {'jumlah': 3, 'mode': 'ballot_code'}, format='json')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(User.objects.filter(admin_owner=self.admin, ballot_code__isnull=False).count(), 3)
+
+
+class BallotCodeTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        res = self.client_for(self.admin).post(
+            '/api/generate-peserta/', {'jumlah': 2, 'prefix': 'tps', 'mode': 'ballot_code'}, format='json')
+        self.assertEqual(res.status_code, 201)
+        self.accounts = res.json()['accounts']
+
+    def test_kode_login_lalu_vote_tanpa_ganti_password(self):
+        akun = self.accounts[0]
+        peserta = User.objects.get(username=akun['username'])
+        self.assertFalse(peserta.has_usable_password())
+        self.assertFalse(peserta.must_change_password)
+
+        res = APIClient().post('/api/token/ballot/', {'code': akun['code'].lower()}, format='json')
+        self.assertEqual(res.status_code, 200)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {res.json()['access']}")
+        res = client.post('/api/vote/', {'kandidat_id': self.kandidat.id}, format='json')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(client.get('/api/hasil/').json(), [{'kandidat': 'Andi', 'total': 1}])
+
+        # scope "vote": endpoint lain menolak token ini
+        self.assertEqual(client.post('/api/change-password/', {'new_password': 'Sandi-Baru-2024'}).status_code, 401)
+
+    def test_kode_hangus_setelah_vote(self):
+        kode = self.accounts[1]['code']
+        self.assertEqual(APIClient().post('/api/token/ballot/', {'code': kode}).status_code, 200)
+        self.assertIsNotNone(BallotCode.objects.get(peserta__username=self.accounts[1]['username']).used_at)
+        # token kedaluwarsa sebelum sempat vote: login ulang dengan kode yang sama
+        res = APIClient().post('/api/token/ballot/', {'code': kode})
+        self.assertEqual(res.status_code, 200)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {res.json()['access']}")
+        self.assertEqual(client.post('/api/vote/', {'kandidat_id': self.kandidat.id}).status_code, 201)
+        self.assertEqual(APIClient().post('/api/token/ballot/', {'code': kode}).status_code, 401)
+        self.assertEqual(APIClient().post('/api/token/ballot/', {'code': 'AAAA-BBBB'}).status_code, 401)
+
+
+KUNCI_BATCH_UJI = 'rahasia-kiosk-uji'
+
+
+def _batch_bertanda(admin, ballots):
+    return {'ballots': ballots, 'signature': tanda_tangan_batch(admin.id, ballots)}
+
+
+@override_settings(BALLOT_BATCH_CHUNK=2, BALLOT_BATCH_SECRET=KUNCI_BATCH_UJI)
+class BallotBatchTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.peserta = [self.buat_peserta(self.admin, f'p{i}') for i in range(4)]
+        lain = self.buat_admin('admin2')
+        self.kandidat_lain = Kandidat.objects.create(admin_owner=lain, nama='Budi')
+        self.buat_peserta(lain, 'q1')
+
+    def ballot(self, peserta, kandidat_id=None, waktu='2026-01-01T08:00:00Z'):
+        return {'peserta': peserta, 'kandidat_id': kandidat_id or self.kandidat.id, 'waktu': waktu}
+
+    def upload(self, ballots, signature=None):
+        data = _batch_bertanda(self.admin, ballots)
+        if signature:
+            data['signature'] = signature
+        return self.client_for(self.admin).post('/api/ballot-batch/', data, format='json')
+
+    def test_hasil_per_ballot(self):
+        Vote.objects.create(voter=self.peserta[3], kandidat=self.kandidat)
+        res = self.upload([
+            self.ballot('p0'),
+            self.ballot('p1'),
+            self.ballot('p0'),                                  # duplikat
+            self.ballot('p2', kandidat_id=self.kandidat_lain.id),  # kandidat admin lain
+            self.ballot('q1'),                                  # peserta admin lain
+            self.ballot('p3'),                                  # sudah vote online
+            self.ballot('p2', waktu='kemarin'),
+            'bukan ballot',
+        ])
+        self.assertEqual(res.status_code, 201)
+        body = res.json()
+        self.assertEqual((body['accepted'], body['rejected']), (2, 6))
+        self.assertEqual([r.get('reason') for r in body['results']], [
+            None, None, 'duplikat_dalam_batch', 'kandidat_tidak_dikenal', 'peserta_tidak_dikenal',
+            'sudah_vote', 'waktu_tidak_valid', 'format_tidak_valid',
+        ])
+        self.assertEqual(total_kandidat(self.kandidat.id), 3)
+        vote = Vote.objects.get(voter=self.peserta[0])
+        self.assertEqual(vote.created_at.isoformat(), '2026-01-01T08:00:00+00:00')
+
+    def test_waktu_masa_depan_ditolak(self):
+        res = self.upload([self.ballot('p0', waktu='2999-01-01T00:00:00Z'), self.ballot('p1', waktu='bukan-waktu')])
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([r['reason'] for r in res.json()['results']], ['waktu_tidak_valid'] * 2)
+
+    def test_tanda_tangan_salah_dan_voting_ditutup(self):
+        self.assertEqual(self.upload([self.ballot('p0')], signature='0' * 64).status_code, 403)
+        self.client_for(self.admin).post('/api/tutup-voting/')
+        self.assertEqual(self.upload([self.ballot('p0')]).status_code, 403)
+        self.assertFalse(Vote.objects.exists())
+
+    def test_kunci_per_admin_dan_wajib_diset(self):
+        lain = User.objects.get(username='admin2')
+        ballots = [self.ballot('p0')]
+        res = self.client_for(self.admin).post('/api/ballot-batch/', _batch_bertanda(lain, ballots), format='json')
+        self.assertEqual(res.status_code, 403)
+        with override_settings(BALLOT_BATCH_SECRET=''):
+            res = self.client_for(self.admin).post(
+                '/api/ballot-batch/', {'ballots': ballots, 'signature': '0' * 64}, format='json')
+        self.assertEqual(res.status_code, 503)
+        self.assertFalse(Vote.objects.exists())
+
+    def test_vote_online_di_tengah_batch(self):
+        # p1 vote online setelah validasi set-wise tapi sebelum chunk-nya di-insert
+        asli = ballot_mod._simpan_batch_vote
+
+        def simpan(admin_id, votes):
+            if not Vote.objects.filter(voter=self.peserta[1]).exists():
+                Vote.objects.create(voter=self.peserta[1], kandidat=self.kandidat)
+            return asli(admin_id, votes)
+
+        with mock.patch.object(ballot_mod, '_simpan_batch_vote', simpan):
+            res = self.upload([self.ballot(f'p{i}') for i in range(3)])
+        self.assertEqual([r['status'] for r in res.json()['results']], ['accepted', 'rejected', 'accepted'])
+        self.assertEqual(total_kandidat(self.kandidat.id), 3)
+
+
+class IdempotencyTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.peserta = self.buat_peserta(self.admin, 'p1')
+        self.auth = {'Authorization': f"Bearer {token_baru(self.peserta)['access']}"}
+
+    def post(self, kandidat_id=None, key='k-1'):
+        headers = {**self.auth, 'Idempotency-Key': key} if key else self.auth
+        return self.client.post('/api/vote/', {'kandidat_id': kandidat_id or self.kandidat.id},
+                                content_type='application/json', headers=headers)
+
+    def test_ulangan_dijawab_dari_store_tanpa_query(self):
+        pertama = self.post()
+        self.assertEqual(pertama.status_code, 201)
+        with self.assertNumQueries(0):
+            ulang = self.post()
+        self.assertEqual((ulang.status_code, ulang.json()), (201, {"message": "Vote terekam."}))
+        self.assertEqual(ulang['Idempotent-Replayed'], 'true')
+        # tanpa key: jalur biasa
+        self.assertEqual(self.post(key=None).json(), {"error": "Anda sudah melakukan vote."})
+        self.assertEqual(total_kandidat(self.kandidat.id), 1)
+
+    def test_key_sama_body_beda_422(self):
+        self.post()
+        lain = Kandidat.objects.create(admin_owner=self.admin, nama='Budi')
+        self.assertEqual(self.post(kandidat_id=lain.id).status_code, 422)
+
+    def test_key_per_peserta(self):
+        self.post()
+        self.auth = {'Authorization': f"Bearer {token_baru(self.buat_peserta(self.admin, 'p2'))['access']}"}
+        self.assertEqual(self.post().status_code, 201)
+        with self.assertNumQueries(0):
+            ulang = self.post()
+        self.assertEqual((ulang.status_code, ulang['Idempotent-Replayed']), (201, 'true'))
+        self.assertEqual(Vote.objects.count(), 2)
+
+    def test_token_dibatalkan_tidak_bisa_replay(self):
+        self.assertEqual(self.post().status_code, 201)
+        self.peserta.token_version += 1
+        with self.captureOnCommitCallbacks(execute=True):
+            self.peserta.save()
+        res = self.post()
+        self.assertEqual(res.status_code, 401)
+        self.assertFalse(res.has_header('Idempotent-Replayed'))
+
+        # token baru tetap dapat hasil yang sama; user nonaktif tidak
+        self.auth = {'Authorization': f"Bearer {token_baru(self.peserta)['access']}"}
+        self.assertEqual(self.post().status_code, 201)
+        self.peserta.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.peserta.save()
+        self.assertEqual(self.post().status_code, 401)
+
+    @override_settings(IDEMPOTENCY_MAX_KEYS=2, IDEMPOTENCY_CACHE_ALIAS=None)
+    def test_store_terbatas(self):
+        store = IdempotencyStore()
+        for i in range(3):
+            store.simpan(f'k{i}', ('sidik', 201, b'{}', 'application/json'))
+        self.assertEqual(len(store.lru), 2)
+        self.assertIsNone(store.get('k0'))
+        # hasil non-201 tidak menimpa 201
+        store.simpan('k2', ('sidik', 400, b'{}', 'application/json'))
+        self.assertEqual(store.get('k2')[1], 201)
+
+
+class ConditionalGetTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.peserta = self.buat_peserta(self.admin, 'p1')
+
+    def test_hasil_etag_304_dan_basi_setelah_vote(self):
+        client = self.client_for()
+        res = client.get('/api/hasil/', {'admin': 'admin1'})
+        etag = res['ETag']
+
+        # Body dan resolusi ?admin= dari cache: tanpa query sama sekali
+        with self.assertNumQueries(0):
+            res = client.get('/api/hasil/', {'admin': 'admin1'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client_for(self.peserta).post('/api/vote/', {'kandidat_id': self.kandidat.id}, format='json')
+        res = client.get('/api/hasil/', {'admin': 'admin1'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(res.json(), [{'kandidat': 'Andi', 'total': 1}])
+
+    def test_etag_sama_untuk_admin_peserta_dan_publik(self):
+        etags = {
+            self.client_for(self.admin).get('/api/hasil/')['ETag'],
+            self.client_for(self.peserta).get('/api/hasil/')['ETag'],
+            self.client_for().get('/api/hasil/', {'admin': 'admin1'})['ETag'],
+        }
+        self.assertEqual(len(etags), 1)
+
+    def test_kandidat_list_basi_setelah_kandidat_diubah(self):
+        client = self.client_for()
+        res = client.get('/api/kandidat/', {'admin': 'admin1'})
+        etag = res['ETag']
+        self.assertEqual(client.get('/api/kandidat/', {'admin': 'admin1'}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client_for(self.admin).patch(f'/api/kandidat/{self.kandidat.id}/', {'nama': 'Andika'}, format='json')
+        res = client.get('/api/kandidat/', {'admin': 'admin1'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['results'][0]['nama'], 'Andika')
+
+
+class ListPesertaTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.peserta = [self.buat_peserta(self.admin, f'p{i:02d}') for i in range(25)]
+        for p in self.peserta[::2]:
+            Vote.objects.create(voter=p, kandidat=kandidat)
+
+    def test_sudah_vote_tanpa_query_per_baris(self):
+        client = self.client_for(self.admin)
+        with self.assertNumQueries(2):  # COUNT + halaman
+            res = client.get('/api/peserta/')
+        self.assertEqual(res.json()['count'], 25)
+        self.assertEqual([r['sudah_vote'] for r in res.json()['results'][:3]], [True, False, True])
+
+    def test_keyset_menelusuri_semua_peserta_tanpa_count(self):
+        client = self.client_for(self.admin)
+        url, usernames = '/api/peserta/?pagination=cursor&page_size=10', []
+        while url:
+            with self.assertNumQueries(1):
+                body = client.get(url).json()
+            self.assertIsNone(body['count'])
+            usernames += [r['username'] for r in body['results']]
+            url = body['next']
+        self.assertEqual(usernames, [p.username for p in self.peserta])
+
+    def test_keyset_dengan_filter_dan_count(self):
+        body = self.client_for(self.admin).get(
+            '/api/peserta/', {'pagination': 'cursor', 'sudah_vote': 'false', 'count': 'exact'}).json()
+        self.assertEqual(body['count'], 12)
+        self.assertFalse(any(r['sudah_vote'] for r in body['results']))
+
+    def test_fields_tanpa_sudah_vote_melewati_exists(self):
+        client = self.client_for(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            res = client.get('/api/peserta/', {'fields': 'username,id'})
+        self.assertEqual(res.json()['results'][0], {'username': 'p00', 'id': self.peserta[0].id})
+        self.assertFalse(any('api_vote' in q['sql'] for q in ctx.captured_queries))
+
+    def test_fields_tidak_dikenal_400(self):
+        res = self.client_for(self.admin).get('/api/peserta/', {'fields': 'username,password'})
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('fields', res.json())
+
+
+class SparseFieldsTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi', visi='v' * 500, misi='m' * 500)
+        self.peserta = self.buat_peserta(self.admin, 'p1')
+        Vote.objects.create(voter=self.peserta, kandidat=self.kandidat)
+
+    def test_kandidat_list_dan_detail(self):
+        client = self.client_for(self.peserta)
+        body = client.get('/api/kandidat/', {'fields': 'nama,total_votes'}).json()
+        self.assertEqual(body['results'], [{'nama': 'Andi', 'total_votes': 1}])
+        detail = client.get(f'/api/kandidat/{self.kandidat.id}/', {'fields': 'id,nama'}).json()
+        self.assertEqual(detail, {'id': self.kandidat.id, 'nama': 'Andi'})
+        self.assertEqual(client.get('/api/kandidat/', {'fields': 'nama,rahasia'}).status_code, 400)
+
+    def test_list_values_sama_dengan_serializer(self):
+        qs = Kandidat.objects.filter(admin_owner=self.admin).annotate(total_votes=total_votes())
+        data = self.client_for(self.peserta).get('/api/kandidat/').json()['results']
+        self.assertEqual(data, json.loads(json.dumps(KandidatListSerializer(qs, many=True).data)))
+
+    def test_fast_renderer_sama_dengan_drf(self):
+        data = {'results': KandidatListSerializer([self.kandidat], many=True).data, 'nama': 'Ä', 'n': None}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    PESERTA_HASH_WORKERS=2, PESERTA_HASH_POOL_MIN=10,
+)
+class GeneratePesertaTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+
+    def test_csv_streaming_username_berurutan_tanpa_bentrok(self):
+        self.buat_peserta(self.admin, 'kelas00007')
+        res = self.client_for(self.admin).post(
+            '/api/generate-peserta/', {'jumlah': 40, 'prefix': 'kelas', 'fmt': 'csv'}, format='json')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res['Content-Type'], 'text/csv')
+
+        rows = list(csv.reader(StringIO(b''.join(res.streaming_content).decode())))
+        self.assertEqual(rows[0], ['username', 'password'])
+        self.assertEqual([r[0] for r in rows[1:3]], ['kelas00008', 'kelas00009'])
+        self.assertEqual(len(rows), 41)
+
+        user = User.objects.get(username=rows[1][0])
+        self.assertTrue(user.check_password(rows[1][1]))
+        self.assertTrue(user.must_change_password)
+        self.assertEqual(user.admin_owner, self.admin)
+        self.assertEqual(User.objects.filter(admin_owner=self.admin).count(), 41)
+
+    @override_settings(PESERTA_BATCH_SIZE=10)
+    def test_stream_dibuat_per_batch_dengan_pool_bersama(self):
+        res = self.client_for(self.admin).post(
+            '/api/generate-peserta/', {'jumlah': 25, 'fmt': 'ndjson'}, format='json')
+        self.assertFalse(User.objects.filter(admin_owner=self.admin).exists())
+        baris = iter(res.streaming_content)
+        next(baris)
+        self.assertEqual(User.objects.filter(admin_owner=self.admin).count(), 10)
+        self.assertEqual(len(list(baris)), 24)
+        self.assertEqual(User.objects.filter(admin_owner=self.admin).count(), 25)
+        self.assertIs(peserta_mod.pool_hash(), peserta_mod.pool_hash())
+
+    def test_json_dibatasi_500(self):
+        res = self.client_for(self.admin).post('/api/generate-peserta/', {'jumlah': 501}, format='json')
+        self.assertEqual(res.status_code, 400)
+        res = self.client_for(self.admin).post('/api/generate-peserta/', {'jumlah': 3, 'fmt': 'ndjson'}, format='json')
+        akun = [json.loads(line) for line in b''.join(res.streaming_content).decode().splitlines()]
+        self.assertEqual([a['username'] for a in akun], ['peserta00001', 'peserta00002', 'peserta00003'])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], PESERTA_BATCH_SIZE=2)
+class ImportPesertaTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.buat_peserta(self.admin, 'nim003')
+
+    def test_import_csv_streaming_dengan_error_per_baris(self):
+        body = "username,password\nnim001,rahasia1\nnim002,\nnim003,x\nnim001,y\nbukan valid,z\n\nnim004,rahasia4\n"
+        res = self.client_for(self.admin).generic('POST', '/api/import-peserta/', body, content_type='text/csv')
+        self.assertEqual(res.status_code, 201)
+        data = res.json()
+        self.assertEqual(data['created'], 3)
+        self.assertEqual([(e['line'], e['username']) for e in data['errors']],
+                         [(4, 'nim003'), (5, 'nim001'), (6, 'bukan valid')])
+        self.assertFalse(data['errors_truncated'])
+
+        nim001 = User.objects.get(username='nim001')
+        self.assertTrue(nim001.check_password('rahasia1'))
+        self.assertTrue(nim001.must_change_password)
+        self.assertEqual(nim001.admin_owner, self.admin)
+        # tanpa password di CSV: password awal dibuat & dikembalikan, bukan akun mati
+        self.assertEqual([a['username'] for a in data['accounts']], ['nim002'])
+        self.assertTrue(User.objects.get(username='nim002').check_password(data['accounts'][0]['password']))
+
+    @override_settings(PESERTA_HASH_WORKERS=2, PESERTA_HASH_POOL_MIN=1)
+    def test_password_acak_dibatasi_dan_satu_pool_per_import(self):
+        body = "username,password\nnim010,\nnim011,\nnim012,rahasia\nnim013,\nnim014,rahasia\n"
+        with mock.patch.object(peserta_mod, 'IMPOR_MAKS_PASSWORD_ACAK', 2), \
+                mock.patch.object(peserta_mod, '_pool', None), \
+                mock.patch.object(peserta_mod, 'ProcessPoolExecutor') as executor:
+            executor.return_value.map = lambda f, it, chunksize: map(f, it)
+            res = self.client_for(self.admin).generic('POST', '/api/import-peserta/', body, content_type='text/csv')
+        data = res.json()
+        self.assertEqual(executor.call_count, 1)  # 3 batch, satu pool
+        self.assertEqual(data['created'], 4)
+        self.assertEqual([a['username'] for a in data['accounts']], ['nim010', 'nim011'])
+        self.assertEqual([(e['line'], e['username']) for e in data['errors']], [(5, 'nim013')])
+
+    def test_username_dibuat_request_lain_bersamaan(self):
+        asli = peserta_mod._insert_impor
+
+        def insert(admin, users):
+            # generate/import lain mengambil nim010 setelah pengecekan sudah_ada
+            if not User.objects.filter(username='nim010').exists():
+                self.buat_peserta(self.admin, 'nim010')
+            return asli(admin, users)
+
+        with mock.patch.object(peserta_mod, '_insert_impor', insert):
+            res = self.client_for(self.admin).generic(
+                'POST', '/api/import-peserta/', 'username\nnim010\nnim011\n', content_type='text/csv')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.json()['created'], 1)
+        self.assertEqual([(e['line'], e['username']) for e in res.json()['errors']], [(2, 'nim010')])
+
+    def test_import_multipart_dan_header_wajib(self):
+        client = self.client_for(self.admin)
+        berkas = SimpleUploadedFile('roster.csv', b'\xef\xbb\xbfUsername\r\nemp01\r\nemp02\r\n', content_type='text/csv')
+        res = client.post('/api/import-peserta/', {'file': berkas}, format='multipart')
+        self.assertEqual(res.json()['created'], 2)
+
+        res = client.generic('POST', '/api/import-peserta/', 'nama\nx\n', content_type='text/csv')
+        self.assertEqual(res.status_code, 400)
+
+
+@override_settings(BALLOT_BATCH_SECRET=KUNCI_BATCH_UJI,
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TurnoutTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.peserta = [self.buat_peserta(self.admin, f'p{i}') for i in range(3)]
+        lain = self.buat_admin('admin2')
+        self.buat_peserta(lain, 'q1')
+
+    def turnout(self, **params):
+        res = self.client_for(self.admin).get('/api/turnout/', params)
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def test_dijaga_inkremental_dari_semua_jalur(self):
+        client = self.client_for(self.admin)
+        client.post('/api/generate-peserta/', {'jumlah': 4, 'prefix': 'gen'}, format='json')
+        client.post('/api/import-peserta/', 'username\nimpor1\n', content_type='text/csv')
+        Vote.objects.create(voter=self.peserta[0], kandidat=self.kandidat,
+                            created_at=timezone.now() - timedelta(minutes=5))
+        self.client_for(self.peserta[1]).post('/api/vote/', {'kandidat_id': self.kandidat.id}, format='json')
+        client.post('/api/ballot-batch/', _batch_bertanda(self.admin,
+            [{'peserta': 'gen00001', 'kandidat_id': self.kandidat.id, 'waktu': '2026-01-01T08:00:30Z'}]), format='json')
+        self.peserta[2].delete()
+        client.delete(f'/api/peserta/{self.peserta[0].id}/')
+
+        body = self.turnout()
+        # 3 + 4 generate + 1 import - 2 dihapus; vote p0 ikut terhapus
+        self.assertEqual((body['total_peserta'], body['sudah_vote'], body['belum_vote']), (6, 2, 4))
+        self.assertEqual(body['turnout_persen'], 33.33)
+        self.assertEqual(body['per_menit'][0], {'menit': '2026-01-01T08:00:00Z', 'jumlah': 1})
+        self.assertEqual(sum(m['jumlah'] for m in body['per_menit']), Vote.objects.count())
+        # sama dengan hitungan ulang dari data mentah
+        total = User.objects.filter(admin_owner=self.admin, is_participant=True).count()
+        self.assertEqual(body['total_peserta'], total)
+
+    @override_settings(VOTE_TALLY_SHARDS=2)
+    def test_hapus_kandidat_tanpa_query_per_vote(self):
+        waktu = timezone.now() - timedelta(minutes=3)
+        sedikit = Kandidat.objects.create(admin_owner=self.admin, nama='Budi')
+        banyak = Kandidat.objects.create(admin_owner=self.admin, nama='Cici')
+        for i, p in enumerate(self.peserta[:2] + [self.buat_peserta(self.admin, f'x{i}') for i in range(20)]):
+            Vote.objects.create(voter=p, kandidat=sedikit if i < 2 else banyak, created_at=waktu)
+        Vote.objects.create(voter=self.peserta[2], kandidat=self.kandidat)
+
+        with CaptureQueriesContext(connection) as q_sedikit:
+            sedikit.delete()
+        with CaptureQueriesContext(connection) as q_banyak:
+            banyak.delete()
+        self.assertEqual(len(q_banyak), len(q_sedikit))
+        body = self.turnout()
+        self.assertEqual((body['sudah_vote'], len(body['per_menit'])), (1, 1))
+        self.assertEqual(total_kandidat(self.kandidat.id), 1)
+
+    def test_biaya_tidak_tumbuh_dengan_jumlah_vote(self):
+        with self.assertNumQueries(2):  # jumlah peserta + rollup per menit
+            self.client_for(self.admin).get('/api/turnout/')
+        for p in self.peserta:
+            Vote.objects.create(voter=p, kandidat=self.kandidat)
+        with self.assertNumQueries(2):
+            body = self.client_for(self.admin).get('/api/turnout/').json()
+        self.assertEqual((body['sudah_vote'], body['turnout_persen']), (3, 100.0))
+
+    def test_sejak_dan_validasi(self):
+        Vote.objects.create(voter=self.peserta[0], kandidat=self.kandidat,
+                            created_at=timezone.now() - timedelta(hours=2))
+        Vote.objects.create(voter=self.peserta[1], kandidat=self.kandidat)
+        body = self.turnout(sejak=(timezone.now() - timedelta(hours=1)).isoformat())
+        self.assertEqual((body['sudah_vote'], len(body['per_menit'])), (2, 1))
+        self.assertEqual(self.client_for(self.admin).get('/api/turnout/', {'sejak': 'kemarin'}).status_code, 400)
+        self.assertEqual(self.client_for(self.peserta[2]).get('/api/turnout/').status_code, 403)
+
+
+class TutupVotingTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.p1 = self.buat_peserta(self.admin, 'p1')
+        self.p2 = self.buat_peserta(self.admin, 'p2')
+        Vote.objects.create(voter=self.p1, kandidat=self.kandidat)
+
+    def test_tutup_voting_membekukan_hasil(self):
+        admin = self.client_for(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = admin.post('/api/tutup-voting/')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.json()['hasil'], [{'kandidat': 'Andi', 'total': 1}])
+        self.assertEqual(admin.post('/api/tutup-voting/').status_code, 409)
+
+        res = self.client_for(self.p2).post('/api/vote/', {'kandidat_id': self.kandidat.id}, format='json')
+        self.assertEqual(res.status_code, 403)
+        self.assertEqual(total_kandidat(self.kandidat.id), 1)
+
+        client = self.client_for()
+        client.get('/api/hasil/', {'admin': 'admin1'})
+        # snapshot final dari cache: tanpa query, header cache panjang
+        with self.assertNumQueries(0):
+            res = client.get('/api/hasil/', {'admin': 'admin1'})
+        self.assertEqual(res.json(), [{'kandidat': 'Andi', 'total': 1}])
+        self.assertIn('immutable', res['Cache-Control'])
+        res = client.get('/api/kandidat/', {'admin': 'admin1'})
+        self.assertEqual(res.json()['results'][0]['total_votes'], 1)
+        self.assertIn('-final-', res['ETag'])
+
+
+class ExportTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.k1 = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.k2 = Kandidat.objects.create(admin_owner=self.admin, nama='Budi')
+        for i, k in enumerate([self.k1, self.k1, self.k2]):
+            Vote.objects.create(voter=self.buat_peserta(self.admin, f'p{i}'), kandidat=k)
+        # ruang admin lain tidak ikut terekspor
+        lain = self.buat_admin('admin2')
+        Vote.objects.create(voter=self.buat_peserta(lain, 'x1'),
+                            kandidat=Kandidat.objects.create(admin_owner=lain, nama='Caca'))
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_export_votes_csv_dan_ndjson(self):
+        client = self.client_for(self.admin)
+        res = client.get('/api/export/votes/')
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        rows = list(csv.reader(StringIO(b''.join(res.streaming_content).decode())))
+        self.assertEqual(rows[0], ['voter', 'kandidat', 'created_at'])
+        self.assertEqual([r[:2] for r in rows[1:]], [['p0', 'Andi'], ['p1', 'Andi'], ['p2', 'Budi']])
+
+        res = client.get('/api/export/votes/', {'fmt': 'ndjson'})
+        self.assertEqual(len(b''.join(res.streaming_content).decode().splitlines()), 3)
+        self.assertEqual(client.get('/api/export/votes/', {'fmt': 'xml'}).status_code, 400)
+
+    def test_export_hasil(self):
+        res = self.client_for(self.admin).get('/api/export/hasil/', {'fmt': 'ndjson'})
+        data = [json.loads(line) for line in b''.join(res.streaming_content).decode().splitlines()]
+        self.assertEqual(data, [{'kandidat_id': self.k1.id, 'kandidat': 'Andi', 'total': 2},
+                                {'kandidat_id': self.k2.id, 'kandidat': 'Budi', 'total': 1}])
+        peserta = User.objects.get(username='p0')
+        self.assertEqual(self.client_for(peserta).get('/api/export/hasil/').status_code, 403)
+
+
+class KatalogCacheTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi', visi='v' * 5000)
+        self.peserta = self.buat_peserta(self.admin, 'p1')
+
+    def test_katalog_dan_username_admin_dari_cache(self):
+        client = self.client_for()
+        client.get('/api/kandidat/', {'admin': 'admin1'})
+        with self.captureOnCommitCallbacks(execute=True):
+            Vote.objects.create(voter=self.peserta, kandidat=self.kandidat)
+
+        # versi hasil berubah -> body dihitung ulang, tapi katalog & username dari cache: hanya query tally
+        with self.assertNumQueries(1):
+            res = client.get('/api/kandidat/', {'admin': 'admin1'})
+        self.assertEqual(res.json()['results'][0]['total_votes'], 1)
+        self.assertEqual(len(res.json()['results'][0]['visi']), 5000)
+
+    def test_invalidasi_saat_kandidat_dan_admin_berubah(self):
+        client = self.client_for()
+        client.get('/api/kandidat/', {'admin': 'admin1'})
+        with self.captureOnCommitCallbacks(execute=True):
+            Kandidat.objects.create(admin_owner=self.admin, nama='Budi')
+        self.assertEqual(len(client.get('/api/kandidat/', {'admin': 'admin1'}).json()['results']), 2)
+
+        self.assertEqual(client.get('/api/hasil/', {'admin': 'admin2'}).json(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            admin2 = self.buat_admin('admin2')
+            Kandidat.objects.create(admin_owner=admin2, nama='Caca')
+        self.assertEqual(client.get('/api/hasil/', {'admin': 'admin2'}).json(), [{'kandidat': 'Caca', 'total': 0}])
+
+    def test_tanpa_redis_worker_lain_melihat_perubahan_setelah_lru_habis(self):
+        # perubahan di "worker lain": signal tidak sampai ke cache proses ini (bulk_create
+        # tanpa signal), yang tersisa hanya L1 yang habis masa berlakunya
+        self.assertIsNone(settings.KATALOG_CACHE_ALIAS)
+        serialize = lambda: list(Kandidat.objects.filter(admin_owner=self.admin).values_list('nama', flat=True))
+        self.assertEqual(katalog_kandidat(self.admin.id, serialize), ['Andi'])
+        self.assertIsNone(admin_id_untuk('admin2'))
+        self.assertIsNone(hasil_final(self.admin.id))
+
+        Kandidat.objects.bulk_create([Kandidat(admin_owner=self.admin, nama='Budi')])
+        admin2, = User.objects.bulk_create([User(username='admin2', is_app_admin=True)])
+        HasilFinal.objects.bulk_create([HasilFinal(admin=self.admin, hasil=[], kandidat=[])])
+        katalog_cache.lru.clear()
+
+        self.assertEqual(sorted(katalog_kandidat(self.admin.id, serialize)), ['Andi', 'Budi'])
+        self.assertEqual(admin_id_untuk('admin2'), admin2.id)
+        self.assertIsNotNone(hasil_final(self.admin.id))
+
+    def test_lru_terbatas(self):
+        lru = LRUCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c')), (1, None, 3))
+
+
+@override_settings(HASIL_STREAM_INTERVAL=0, HASIL_STREAM_POLL=60)
+class LiveHasilTests(VotingTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.peserta = self.buat_peserta(self.admin, 'p1')
+
+    def test_viewer_berbagi_snapshot_dan_dapat_push_saat_vote(self):
+        async def skenario():
+            q1 = broadcaster.subscribe(self.admin.id)
+            awal = await asyncio.wait_for(q1.get(), 5)
+            q2 = broadcaster.subscribe(self.admin.id)
+            # viewer kedua langsung dapat snapshot yang sama, tanpa hitung ulang
+            self.assertIs(q2.get_nowait(), awal)
+            self.assertEqual(awal, [{'kandidat': 'Andi', 'total': 0}])
+
+            await sync_to_async(Vote.objects.create)(voter=self.peserta, kandidat=self.kandidat)
+            # POLL=60 detik: push ini hanya bisa datang dari notify() saat vote tercatat
+            baru = await asyncio.wait_for(q1.get(), 5)
+            self.assertEqual(baru, [{'kandidat': 'Andi', 'total': 1}])
+            self.assertEqual(await asyncio.wait_for(q2.get(), 5), baru)
+
+            broadcaster.unsubscribe(self.admin.id, q1)
+            broadcaster.unsubscribe(self.admin.id, q2)
+            self.assertFalse(broadcaster.has_subscribers())
+
+        asyncio.run(skenario())
+
+    def test_stream_di_wsgi_minta_fallback_polling(self):
+        res = self.client.get('/api/hasil/stream/', {'admin': 'admin1'})
+        self.assertEqual(res.status_code, 503)
+
+
+class MetricsTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        metrics_store.reset()
+        self.admin = self.buat_admin()
+        Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.staff = User.objects.create_user(username='ops', password=None, is_staff=True)
+
+    def test_middleware_mencatat_per_view_dan_gabung_antar_proses(self):
+        with tempfile.TemporaryDirectory() as folder, \
+                override_settings(METRICS_ENABLED=True, METRICS_DIR=folder, METRICS_FLUSH_INTERVAL=0):
+            client = APIClient()
+            client.get('/api/hasil/', {'admin': 'admin1'})
+            client.get('/api/hasil/', {'admin': 'admin1'})
+            # file dari "worker lain"
+            with open(f'{folder}/metrics-999999.json', 'w') as f:
+                json.dump(metrics_store.agregat(), f)
+
+            client.force_authenticate(self.staff)
+            body = client.get('/api/metrics/').content.decode()
+
+        self.assertIn('voting_request_duration_seconds_count{view="hasil"} 4', body)
+        self.assertIn('voting_db_queries_bucket{view="hasil",le="+Inf"} 4', body)
+        self.assertIn('voting_db_seconds_total{view="hasil"}', body)
+
+    def test_file_worker_mati_dilebur_ke_arsip(self):
+        with tempfile.TemporaryDirectory() as folder, \
+                override_settings(METRICS_ENABLED=True, METRICS_DIR=folder, METRICS_FLUSH_INTERVAL=0):
+            APIClient().get('/api/hasil/', {'admin': 'admin1'})
+            satu = metrics_store.agregat()
+            for pid in (999998, 999999):
+                with open(f'{folder}/metrics-{pid}.json', 'w') as f:
+                    json.dump(satu, f)
+            tandai_proses_mati(999998)
+            self.assertEqual(metrics_store.agregat()['hasil']['latency']['count'], 3)
+            # 999999 tidak hidup: dilebur saat scrape, file proses ini tetap
+            self.assertEqual(set(os.listdir(folder)),
+                             {'.metrics.lock', 'metrics-arsip.json', f'metrics-{os.getpid()}.json'})
+            self.assertEqual(metrics_store.agregat()['hasil']['latency']['count'], 3)
+
+    def test_nonaktif_tanpa_middleware_dan_hanya_staff(self):
+        APIClient().get('/api/hasil/', {'admin': 'admin1'})
+        self.assertEqual(metrics_store.agregat(), {})
+        self.assertEqual(self.client_for(self.admin).get('/api/metrics/').status_code, 403)
+
+
+@override_settings(ADMISSION_ENABLED=True, ADMISSION_CACHE_ALIAS=None)
+class AdmissionTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.peserta = self.buat_peserta(self.admin, 'p1')
+
+    @override_settings(ADMISSION_RATE_LIMITS={'hasil': {'anon': (2, 0.01)}})
+    def test_429_sebelum_query_db(self):
+        client = APIClient()
+        for _ in range(2):
+            self.assertEqual(client.get('/api/hasil/', {'admin': 'admin1'}).status_code, 200)
+        with self.assertNumQueries(0):
+            res = client.get('/api/hasil/', {'admin': 'admin1'})
+        self.assertEqual(res.status_code, 429)
+        self.assertGreaterEqual(int(res['Retry-After']), 100)
+        # bucket per principal: IP lain tetap dilayani
+        self.assertEqual(client.get('/api/hasil/', {'admin': 'admin1'}, REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    def test_ip_klien_dari_proxy_tepercaya(self):
+        rf = RequestFactory()
+        lewat_proxy = {'REMOTE_ADDR': '10.0.0.5', 'HTTP_X_FORWARDED_FOR': '6.6.6.6, 1.2.3.4, 10.0.0.9'}
+        with self.settings(ADMISSION_TRUSTED_PROXIES=[]):
+            self.assertEqual(principal(rf.get('/api/hasil/', **lewat_proxy)), ('anon', '10.0.0.5'))
+        with self.settings(ADMISSION_TRUSTED_PROXIES=['10.0.0.0/8']):
+            # hop paling kanan yang bukan proxy; 6.6.6.6 bisa dipalsukan klien
+            self.assertEqual(principal(rf.get('/api/hasil/', **lewat_proxy)), ('anon', '1.2.3.4'))
+            # header hanya dipercaya dari proxy
+            langsung = rf.get('/api/hasil/', REMOTE_ADDR='1.2.3.4', HTTP_X_FORWARDED_FOR='9.9.9.9')
+            self.assertEqual(principal(langsung), ('anon', '1.2.3.4'))
+
+    @override_settings(ADMISSION_RATE_LIMITS={'hasil': {'anon': (1, 0.01)}}, ADMISSION_TRUSTED_PROXIES=['10.0.0.1'])
+    def test_bucket_anon_per_klien_di_belakang_proxy(self):
+        client = APIClient(REMOTE_ADDR='10.0.0.1')
+        for ip in ('1.1.1.1', '2.2.2.2'):
+            res = client.get('/api/hasil/', {'admin': 'admin1'}, HTTP_X_FORWARDED_FOR=ip)
+            self.assertEqual(res.status_code, 200)
+        res = client.get('/api/hasil/', {'admin': 'admin1'}, HTTP_X_FORWARDED_FOR='1.1.1.1')
+        self.assertEqual(res.status_code, 429)
+
+    @override_settings(ADMISSION_RATE_LIMITS={}, ADMISSION_GLOBAL=(4, 0.01), ADMISSION_CADANGAN=0.5)
+    def test_vote_diprioritaskan_di_atas_baca_hasil(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token_baru(self.peserta)['access']}")
+        statuses = [client.get('/api/hasil/').status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+        res = client.post('/api/vote/', {'kandidat_id': self.kandidat.id}, format='json')
+        self.assertEqual(res.status_code, 201)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRoutingTests(VotingTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.buat_admin()
+        self.kandidat = Kandidat.objects.create(admin_owner=self.admin, nama='Andi')
+        self.p1 = self.buat_peserta(self.admin, 'p1')
+        self.p2 = self.buat_peserta(self.admin, 'p2')
+
+    def request_untuk(self, user=None):
+        kwargs = {'HTTP_AUTHORIZATION': f"Bearer {token_baru(user)['access']}"} if user else {}
+        return RequestFactory().get('/api/hasil/', **kwargs)
+
+    def test_baca_ke_replica_hanya_di_blok_baca_replika(self):
+        with baca_replika(self.request_untuk()):
+            self.assertEqual(Kandidat.objects.all().db, 'replica1')
+            self.assertEqual(router.db_for_write(Kandidat), 'default')
+        self.assertEqual(Kandidat.objects.all().db, 'default')
+
+    def test_read_your_writes_setelah_vote(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token_baru(self.p1)['access']}")
+        res = client.post('/api/vote/', {'kandidat_id': self.kandidat.id}, format='json')
+        self.assertEqual(res.status_code, 201)
+
+        # pemilih tadi dibaca dari primary, peserta lain tetap dari replica
+        self.assertEqual(alias_baca(self.request_untuk(self.p1)), 'default')
+        self.assertEqual(alias_baca(self.request_untuk(self.p2)), 'replica1')
+
+    def test_isi_cache_katalog_dari_primary(self):
+        # katalog, username admin & status final di-cache lama: jangan diisi dari replica yang tertinggal
+        with baca_replika(self.request_untuk()), CaptureQueriesContext(connection) as ctx, \
+                mock.patch('api.hasil.total_per_kandidat', return_value={}):
+            self.assertEqual(admin_id_untuk('admin1'), self.admin.id)
+            self.assertIsNone(hasil_final(self.admin.id))
+            self.assertEqual([k['nama'] for k in daftar_kandidat(self.admin.id)], ['Andi'])
+        self.assertEqual(len(ctx), 3)
+
+
+def _nama_route(patterns, prefix=''):
+    """
+    Semua nama route di bawah /api/ (api/urls.py + router kandidat), termasuk dari include().
+    """
+    nama = set()
+    for p in patterns:
+        route = prefix + str(p.pattern)
+        if hasattr(p, 'url_patterns'):
+            nama |= _nama_route(p.url_patterns, route)
+        elif p.name and route.startswith('api/'):
+            nama.add(p.name)
+    return nama
+
+
+@override_settings(BALLOT_BATCH_SECRET=KUNCI_BATCH_UJI,
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class QueryBudgetTests(VotingTestMixin, TestCase):
+    """
+    Jumlah query tiap endpoint (cache dingin) harus sama di data kecil & besar,
+    dan tidak melebihi budget. Route baru wajib didaftarkan di BUDGET.
+    """
+    UKURAN = [(2, 4), (20, 40)]  # (kandidat, peserta yang sudah vote)
+
+    # nama route: (role, method, path, data, budget query)
+    BUDGET = {
+        'api-root': (None, 'get', '/api/', None, 0),
+        'token_obtain_pair': (None, 'post', '/api/token/', lambda d: {'username': 'admin1', 'password': 'rahasia'}, 1),
+        'token_refresh': (None, 'post', '/api/token/refresh/', lambda d: {'refresh': d['refresh']}, 2),
+        'token_ballot': (None, 'post', '/api/token/ballot/', lambda d: {'code': d['kode']}, 2),
+        'register_admin': (None, 'post', '/api/register-admin/', lambda d: {'username': 'adminbaru', 'password': 'Sandi-Baru-2024'}, 1),
+        'me': ('peserta', 'get', '/api/me/', None, 1),
+        'change_password': ('peserta', 'post', '/api/change-password/', lambda d: {'new_password': 'Sandi-Baru-2024'}, 2),
+        'generate_peserta': ('admin', 'post', '/api/generate-peserta/', lambda d: {'jumlah': 5}, 6),
+        'import_peserta': ('admin', 'post', '/api/import-peserta/', None, 6),
+        'peserta-list': ('admin', 'get', '/api/peserta/', None, 3),
+        'peserta-detail': ('admin', 'delete', lambda d: f"/api/peserta/{d['terhapus'].id}/", None, 18),
+        'vote': ('pemilih', 'post', '/api/vote/', lambda d: {'kandidat_id': d['kandidat'].id}, 8),
+        'hasil': ('peserta', 'get', '/api/hasil/', None, 3),
+        'turnout': ('admin', 'get', '/api/turnout/', None, 3),
+        'kandidat-list': (None, 'get', '/api/kandidat/', lambda d: {'admin': 'admin1'}, 4),
+        'kandidat-detail': ('peserta', 'get', lambda d: f"/api/kandidat/{d['kandidat'].id}/", None, 2),
+        'export-votes': ('admin', 'get', '/api/export/votes/', None, 2),
+        'export-hasil': ('admin', 'get', '/api/export/hasil/', None, 2),
+        'metrics': ('staff', 'get', '/api/metrics/', None, 1),
+        # kedua ballot di satu menit rollup yang belum ada (+2: bulk_create shard menit itu & UPDATE ulang)
+        'ballot_batch': ('admin', 'post', '/api/ballot-batch/', lambda d: _batch_bertanda(d['admin'],
+            [{'peserta': p.username, 'kandidat_id': d['kandidat'].id, 'waktu': '2026-01-01T08:00:00Z'}
+             for p in d['kiosk']]), 15),
+        # terakhir: setelah ini vote ke ruang admin1 ditolak
+        'tutup_voting': ('admin', 'post', '/api/tutup-voting/', None, 9),
+    }
+    # vote diukur dua kali: menit rollup turnout sudah ada (BUDGET) dan menit baru
+    # (+ UPDATE kosong dan bulk_create semua shard menit itu); route: (role, budget)
+    BUDGET_MENIT_BARU = {'vote': ('pemilih3', 10)}
+    # stream SSE tidak pernah selesai; snapshot-nya sama dengan hitung_hasil di 'hasil'
+    DIKECUALIKAN = {'hasil-stream'}
+
+    def seed(self, jumlah_kandidat, jumlah_vote):
+        from .ballot import buat_kode, digest_kode
+        from .models import BallotCode
+
+        admin = User.objects.create_user(username='admin1', password='rahasia', is_app_admin=True)
+        kandidat = [Kandidat.objects.create(admin_owner=admin, nama=f'K{i}', visi='v' * 200)
+                    for i in range(jumlah_kandidat)]
+        peserta = [self.buat_peserta(admin, f'p{i}') for i in range(jumlah_vote + 6)]
+        for i, p in enumerate(peserta[:jumlah_vote]):
+            Vote.objects.create(voter=p, kandidat=kandidat[i % jumlah_kandidat])
+        kode = buat_kode()
+        BallotCode.objects.create(peserta=peserta[-1], digest=digest_kode(kode))
+        return {
+            'admin': admin, 'peserta': peserta[0], 'terhapus': peserta[1], 'pemilih': peserta[-3],
+            'kandidat': kandidat[0], 'kode': kode, 'kiosk': peserta[-5:-3], 'pemilih3': peserta[-6],
+            'staff': User.objects.create_user(username='staff', password=None, is_staff=True),
+            'refresh': token_baru(peserta[0])['refresh'],
+        }
+
+    def jalankan(self, d, nama, role, method, path, data):
+        cache.clear()
+        katalog_cache.lru.clear()
+        client = APIClient()
+        if role:
+            # dibaca ulang: token_version bisa sudah naik (change_password)
+            user = User.objects.get(pk=d[role].pk)
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {token_baru(user)['access']}")
+        path = path(d) if callable(path) else path
+        kwargs = {'format': 'json'} if method == 'post' else {}
+        if nama == 'import_peserta':
+            data, kwargs = 'username\nimpor1\nimpor2\n', {'content_type': 'text/csv'}
+        elif callable(data):
+            data = data(d)
+        with CaptureQueriesContext(connection) as ctx:
+            res = getattr(client, method)(path, data, **kwargs)
+            if res.streaming:
+                b''.join(res.streaming_content)
+        self.assertLess(res.status_code, 400, f"{nama}: {res.status_code}")
+        return len(ctx)
+
+    def ukur(self, jumlah_kandidat, jumlah_vote):
+        hasil = {}
+        with transaction.atomic():
+            d = self.seed(jumlah_kandidat, jumlah_vote)
+            for nama, (role, method, path, data, budget) in self.BUDGET.items():
+                if nama in self.BUDGET_MENIT_BARU:
+                    # baris rollup menit ini (dan berikutnya, kalau jam lewat menit) sudah
+                    # ada, seperti di tengah pemilihan
+                    sekarang = turnout.menit(timezone.now())
+                    for m in (sekarang, sekarang + timedelta(minutes=1)):
+                        VoteMenit.objects.bulk_create(
+                            [VoteMenit(admin_id=d['admin'].id, menit=m, shard=i) for i in range(jumlah_shard())],
+                            ignore_conflicts=True,
+                        )
+                hasil[nama] = self.jalankan(d, nama, role, method, path, data)
+                if nama in self.BUDGET_MENIT_BARU:
+                    # vote pertama di menit baru: baris semua shard menit itu dibuat dulu
+                    VoteMenit.objects.all().delete()
+                    pemilih, _ = self.BUDGET_MENIT_BARU[nama]
+                    hasil[f'{nama} (menit baru)'] = self.jalankan(d, nama, pemilih, method, path, data)
+            transaction.set_rollback(True)
+        return hasil
+
+    def test_semua_route_punya_budget(self):
+        from django.urls import get_resolver
+        self.assertEqual(_nama_route(get_resolver().url_patterns), set(self.BUDGET) | self.DIKECUALIKAN)
+
+    def test_query_konstan_dan_dalam_budget(self):
+        kecil, besar = (self.ukur(*u) for u in self.UKURAN)
+        budget_semua = {nama: budget for nama, (*_, budget) in self.BUDGET.items()}
+        budget_semua.update({f'{nama} (menit baru)': budget for nama, (_, budget) in self.BUDGET_MENIT_BARU.items()})
+        for nama, budget in budget_semua.items():
+            with self.subTest(route=nama):
+                self.assertEqual(kecil[nama], besar[nama], "jumlah query tumbuh dengan ukuran data")
+                self.assertLessEqual(besar[nama], budget)
+
+    @skipUnless(connection.vendor == 'sqlite', "rencana query yang diperiksa format EXPLAIN SQLite")
+    def test_explain_memakai_index(self):
+        admin = self.buat_admin()
+        # (queryset, potongan nama index yang harus dipakai)
+        rencana = [
+            (Kandidat.objects.filter(admin_owner=admin).order_by('-created_at'), 'kandidat_admin_created_idx'),
+            (Vote.objects.filter(kandidat_id=1), 'api_vote_kandidat_id'),
+            (User.objects.filter(admin_owner=admin, is_participant=True).order_by('date_joined', 'id'),
+             'user_peserta_joined_idx'),
+            # unique_tally_shard: di SQLite namanya sqlite_autoindex_*
+            (VoteTally.objects.filter(kandidat_id=1, shard=0), 'kandidat_id=? AND shard=?'),
+        ]
+        for qs, index in rencana:
+            with self.subTest(index=index):
+                plan = qs.explain()
+                self.assertIn(index, plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+
+class AdminScaleTests(TestCase):
+    """
+    Changelist Django admin di 100k peserta + 100k vote: jumlah query tetap dan
+    tidak ada COUNT(*) atas seluruh tabel.
+    """
+    JUMLAH = 100_000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('root', password=None)
+        cls.admins = [User.objects.create_user(f'admin{i}', password=None, is_app_admin=True) for i in range(3)]
+        cls.kandidat = [Kandidat.objects.create(admin_owner=a, nama=f'K{i}') for i, a in enumerate(cls.admins)]
+        # 100k baris lewat INSERT ... SELECT (bulk_create 100k User di SQLite ~10 detik)
+        a, b, c = (admin.pk for admin in cls.admins)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {User._meta.db_table} (password, is_superuser, username, first_name, last_name, email, "
+                f"is_staff, is_active, date_joined, is_app_admin, is_participant, must_change_password, "
+                f"token_version, admin_owner_id) "
+                f"WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < %s) "
+                f"SELECT '!', false, 'p' || i, '', '', '', false, true, CURRENT_TIMESTAMP, false, true, false, 0, "
+                f"CASE i %% 3 WHEN 0 THEN %s WHEN 1 THEN %s ELSE %s END FROM n",
+                [cls.JUMLAH - 1, a, b, c],
+            )
+            # tiap peserta vote kandidat admin-nya
+            cursor.execute(
+                f"INSERT INTO {Vote._meta.db_table} (voter_id, kandidat_id, created_at) "
+                f"SELECT u.id, k.id, k.created_at FROM {User._meta.db_table} u "
+                f"JOIN {Kandidat._meta.db_table} k ON k.admin_owner_id = u.admin_owner_id WHERE u.is_participant"
+            )
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def test_changelist_query_tetap(self):
+        self.assertEqual(Vote.objects.count(), self.JUMLAH)
+        # session, user, pilihan filter admin, hitungan (estimasi / COUNT ber-LIMIT), halaman
+        halaman = [
+            ('/admin/api/user/', 5),
+            ('/admin/api/user/?is_participant__exact=1', 5),
+            (f'/admin/api/user/?admin={self.admins[1].pk}', 5),
+            ('/admin/api/vote/', 5),
+            (f'/admin/api/vote/?admin={self.admins[2].pk}&q=p1234', 5),
+            # tabel kecil: estimasi di bawah ADMIN_COUNT_MAKS, lanjut COUNT ber-LIMIT
+            ('/admin/api/kandidat/', 6),
+        ]
+        for url, budget in halaman:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as ctx:
+                    res = self.client.get(url)
+                self.assertEqual(res.status_code, 200)
+                self.assertLessEqual(len(ctx), budget)
+                for q in ctx.captured_queries:
+                    if 'COUNT(' in q['sql']:
+                        self.assertIn('LIMIT', q['sql'])
+
+
+class BenchTests(TestCase):
+    def test_persentil(self):
+        data = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(persentil(data, 50), 0.05)
+        self.assertEqual(persentil(data, 99), 0.099)
+        self.assertEqual(persentil([], 95), 0.0)
+
+    def test_regresi_terhadap_baseline(self):
+        baseline = {'vote': {'p95_ms': 10.0, 'rps': 100.0, 'queries': 4}}
+        self.assertEqual(bandingkan({'vote': {'p95_ms': 11.5, 'rps': 90.0, 'queries': 4}}, baseline, 0.2), [])
+        regresi = bandingkan({'vote': {'p95_ms': 13.0, 'rps': 70.0, 'queries': 5}}, baseline, 0.2)
+        self.assertEqual(len(regresi), 3)
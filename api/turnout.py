@@ -0,0 +1,114 @@
+"""
+Statistik turnout per admin dari agregat inkremental, bukan scan Vote/User:
+JumlahPeserta (satu baris per admin) dan VoteMenit (vote per menit per shard).
+Dijaga signal Vote/User (api/signals.py) dan jalur bulk (generate & import
+peserta, upload batch kiosk), jadi biaya baca O(jumlah menit), bukan O(vote).
+"""
+from collections import Counter
+from datetime import timezone
+
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Mod, TruncMinute
+
+from .models import JumlahPeserta, Vote, VoteMenit
+from .tally import jumlah_shard, shard_untuk
+
+
+def menit(waktu):
+    return waktu.replace(second=0, microsecond=0)
+
+
+def tambah_peserta(admin_id, n=1):
+    baris = JumlahPeserta.objects.filter(admin_id=admin_id)
+    if not baris.update(total=F('total') + n):
+        JumlahPeserta.objects.bulk_create([JumlahPeserta(admin_id=admin_id)], ignore_conflicts=True)
+        baris.update(total=F('total') + n)
+
+
+def _tambah_menit(admin_id, m, shard, n):
+    baris = VoteMenit.objects.filter(admin_id=admin_id, menit=m, shard=shard)
+    if baris.update(total=F('total') + n):
+        return
+    # Menit baru: semua shard dibuat sekaligus (seperti tally.siapkan_shard), vote
+    # berikutnya di menit ini cukup satu UPDATE. ignore_conflicts: tanpa savepoint
+    # walaupun request lain membuat menit yang sama bersamaan.
+    VoteMenit.objects.bulk_create(
+        [VoteMenit(admin_id=admin_id, menit=m, shard=i) for i in range(jumlah_shard())],
+        ignore_conflicts=True,
+    )
+    baris.update(total=F('total') + n)
+
+
+def kurangi_peserta(admin_id):
+    JumlahPeserta.objects.filter(admin_id=admin_id, total__gt=0).update(total=F('total') - 1)
+
+
+def tambah_vote(admin_id, voter_id, waktu):
+    _tambah_menit(admin_id, menit(waktu), shard_untuk(voter_id), 1)
+
+
+def tambah_vote_banyak(admin_id, pasangan):
+    """
+    Rollup untuk banyak vote sekaligus (upload batch): `pasangan` = (voter_id, waktu).
+    """
+    jumlah = Counter((menit(waktu), shard_untuk(voter_id)) for voter_id, waktu in pasangan)
+    for (m, shard), n in sorted(jumlah.items()):
+        _tambah_menit(admin_id, m, shard, n)
+
+
+def kurangi_vote(admin_id, voter_id, waktu):
+    """
+    Rollup menit vote -1. Vote dari sebelum rollup ada tercatat di shard 0,
+    jadi kalau shard peserta kosong, kurangi shard lain di menit yang sama.
+    """
+    _kurangi_menit(admin_id, menit(waktu), shard_untuk(voter_id))
+
+
+def _kurangi_menit(admin_id, m, shard):
+    qs = VoteMenit.objects.filter(admin_id=admin_id, menit=m, total__gt=0)
+    if qs.filter(shard=shard).update(total=F('total') - 1):
+        return
+    pk = qs.order_by('shard').values_list('pk', flat=True).first()
+    if pk is not None:
+        VoteMenit.objects.filter(pk=pk, total__gt=0).update(total=F('total') - 1)
+
+
+def kurangi_vote_kandidat(admin_id, kandidat_id):
+    """
+    Rollup untuk semua vote kandidat yang akan dihapus: vote dikelompokkan per
+    (menit, shard) di DB, satu UPDATE per kelompok, bukan per vote. Kelompok yang
+    shard-nya kurang (lihat kurangi_vote) dikurangi satu per satu.
+    """
+    jumlah = (Vote.objects.filter(kandidat_id=kandidat_id)
+                  .values(m=TruncMinute('created_at', tzinfo=timezone.utc), s=Mod('voter_id', jumlah_shard()))
+                  .annotate(n=Count('id')).values_list('m', 's', 'n'))
+    for m, shard, n in jumlah:
+        shard = int(shard)
+        baris = VoteMenit.objects.filter(admin_id=admin_id, menit=m, shard=shard, total__gte=n)
+        if baris.update(total=F('total') - n):
+            continue
+        for _ in range(n):
+            _kurangi_menit(admin_id, m, shard)
+
+
+def statistik(admin_id, sejak=None, using='default'):
+    """
+    Total peserta, sudah/belum vote, persentase turnout, dan deret vote per menit
+    (opsional mulai `sejak`) ruang admin.
+    """
+    total = (JumlahPeserta.objects.using(using).filter(admin_id=admin_id)
+                 .values_list('total', flat=True).first()) or 0
+    rows = VoteMenit.objects.using(using).filter(admin_id=admin_id)
+    if sejak is not None:
+        sudah = rows.aggregate(t=Sum('total'))['t'] or 0
+        rows = rows.filter(menit__gte=menit(sejak))
+    deret = list(rows.values('menit').annotate(jumlah=Sum('total')).filter(jumlah__gt=0).order_by('menit'))
+    if sejak is None:
+        sudah = sum(r['jumlah'] for r in deret)
+    return {
+        "total_peserta": total,
+        "sudah_vote": sudah,
+        "belum_vote": max(total - sudah, 0),
+        "turnout_persen": round(sudah * 100 / total, 2) if total else 0.0,
+        "per_menit": [{"menit": r['menit'], "jumlah": r['jumlah']} for r in deret],
+    }
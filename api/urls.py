@@ -7,12 +7,16 @@ urlpatterns = [
     # === Auth & User Management ===
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/ballot/', views.ballot_login, name='token_ballot'),
     path('register-admin/', views.register_admin, name='register_admin'),
     path('me/', views.me, name='me'),
     path('change-password/', views.change_password, name='change_password'),
 
     # === Admin Actions ===
     path('generate-peserta/', views.generate_peserta, name='generate_peserta'),
+    path('import-peserta/', views.import_peserta, name='import_peserta'),
+    path('ballot-batch/', views.ballot_batch, name='ballot_batch'),
+    path('tutup-voting/', views.tutup_voting_view, name='tutup_voting'),
 
     # === Peserta Management ===
     # URL untuk mendapatkan daftar semua peserta (GET)
@@ -24,4 +28,13 @@ urlpatterns = [
     # === Vote & Hasil ===
     path('vote/', views.vote, name='vote'),
     path('hasil/', views.hasil, name='hasil'),
+    path('turnout/', views.turnout, name='turnout'),
+    path('hasil/stream/', views.hasil_stream, name='hasil-stream'),
+
+    # === Export audit (streaming CSV/NDJSON) ===
+    path('export/votes/', views.export_votes, name='export-votes'),
+    path('export/hasil/', views.export_hasil, name='export-hasil'),
+
+    # === Monitoring ===
+    path('metrics/', views.metrics, name='metrics'),
 ]
\ No newline at end of file
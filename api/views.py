@@ -1,15 +1,41 @@
-import random, string
+import asyncio, csv, io, json
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Exists, OuterRef
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
 from django.utils.timezone import localtime
+from django.views.decorators.http import require_GET
 from rest_framework import status, viewsets
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS, AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 
-from .models import Kandidat, Vote
+from .authentication import ClaimsJWTAuthentication
+from .cache import admin_id_untuk, ambil_versioned, versi_hasil
+from .hasil import (
+    VotingDitutup, cek_voting_dibuka, daftar_kandidat, hasil_final, hitung_hasil, pilih_fields, tutup_voting,
+)
+from .idempotency import idempoten
+from .ballot import digest_kode, tanda_tangan_valid, unggah_batch
+from .live import broadcaster
+from .metrics import render_prometheus, store as metrics_store
+from .models import BallotCode, Kandidat, Vote
+from .pagination import KeysetPagination
+from .penulis import tulis
+from .replica import alias_baca, baca_replika, sedang_baca_replika
+from .peserta import buat_peserta_bertahap, buat_peserta_massal, impor_peserta_csv
+from .tally import total_votes
+from .turnout import statistik as statistik_turnout
 from .serializers import (
     RegisterAdminSerializer,
     GeneratePesertaSerializer,
@@ -18,12 +44,144 @@ from .serializers import (
     KandidatCreateUpdateSerializer,
     KandidatListSerializer,
     VoteCreateSerializer,
+    BallotLoginSerializer,
+    BallotBatchSerializer,
+    token_ballot,
+    token_baru,
 )
 from .permissions import IsAppAdmin, IsParticipant
 
 User = get_user_model()
 
 
+def _admin_id_dari_request(request):
+    """
+    Admin pemilik "ruang" yang dilihat request: admin itu sendiri, admin pemilik
+    peserta, atau ?admin=USERNAME untuk akses publik. None kalau tidak ada.
+    """
+    user = request.user
+    if user.is_authenticated and getattr(user, 'is_app_admin', False):
+        return user.id
+    if user.is_authenticated and getattr(user, 'is_participant', False):
+        return user.admin_owner_id
+    admin_username = request.query_params.get('admin')
+    if not admin_username:
+        return None
+    return admin_id_untuk(admin_username)
+
+
+def _data_versioned(request, nama, admin_id, hitung, dari_final=None):
+    """
+    Conditional GET untuk data per admin: ETag = versi hasil admin. Return
+    (etag, data); data None kalau If-None-Match cocok (304). Body diambil dari
+    cache selama versinya sama. Kalau voting admin sudah ditutup, data diambil
+    dari snapshot final lewat dari_final(final) dengan ETag yang tidak berubah lagi.
+    """
+    final = hasil_final(admin_id) if dari_final else None
+    if final:
+        etag = f'"{nama}-{admin_id}{_ETAG_FINAL}{final["id"]}"'
+    else:
+        versi = versi_hasil(admin_id)
+        etag = f'"{nama}-{admin_id}-{versi}"'
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [t.strip() for t in if_none_match.split(',')]:
+        return etag, None
+    if final:
+        return etag, dari_final(final)
+    timeout = min(settings.HASIL_CACHE_TIMEOUT, settings.REPLICA_STICKY_SECONDS) if sedang_baca_replika() else None
+    return etag, ambil_versioned(nama, admin_id, versi, request.build_absolute_uri(), hitung, timeout)
+
+
+_ETAG_FINAL = '-final-'
+
+
+def _header_versioned(response, etag):
+    response['ETag'] = etag
+    if _ETAG_FINAL in etag:
+        # snapshot voting yang sudah ditutup tidak akan berubah lagi
+        response['Cache-Control'] = f'public, max-age={settings.HASIL_FINAL_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def _respon_versioned(request, nama, admin_id, hitung, dari_final=None):
+    etag, data = _data_versioned(request, nama, admin_id, hitung, dari_final)
+    response = Response(status=304) if data is None else Response(data, status=200)
+    return _header_versioned(response, etag)
+
+
+def _fields_diminta(request, tersedia):
+    """
+    Sparse fieldset ?fields=a,b -> list nama field (None = semua). Field tidak dikenal -> 400.
+    """
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    salah = [f for f in fields if f not in tersedia]
+    if salah:
+        raise ValidationError({"fields": f"Field tidak dikenal: {', '.join(salah)}. Tersedia: {', '.join(tersedia)}."})
+    return fields
+
+
+def _halaman_katalog(request, admin_id, paginator, data=None):
+    """
+    Daftar kandidat dari katalog ter-cache + total suara dari tally (query sempit,
+    tanpa visi/misi), dipaginasi seperti list() biasa. `data`: daftar jadi (snapshot final).
+    ?fields=nama,total_votes untuk halaman hasil yang tidak butuh visi/misi.
+    """
+    fields = _fields_diminta(request, KandidatListSerializer.Meta.fields)
+    if data is None:
+        data = daftar_kandidat(admin_id)
+    page = paginator.paginate_queryset(data, request)
+    if page is not None:
+        return paginator.get_paginated_response(pilih_fields(page, fields)).data
+    return pilih_fields(data, fields)
+
+
+# Alasan vote ditolak -> (pesan, status HTTP).
+PENOLAKAN_VOTE = {
+    'kandidat_tidak_ada': ("Kandidat tidak ditemukan.", 404),
+    'bukan_kandidat_admin': ("Anda tidak berhak memilih kandidat ini.", 403),
+    'sudah_vote': ("Anda sudah melakukan vote.", 400),
+    'voting_ditutup': ("Voting sudah ditutup.", 403),
+}
+
+
+def _catat_vote(voter, kandidat_id):
+    """
+    Cek kandidat + insert vote + update tally kandidat (signal) dalam satu transaksi.
+    Return None kalau terekam, selain itu alasan penolakan (key PENOLAKAN_VOTE).
+    Dengan SQLITE_WRITE_QUEUE dikerjakan thread penulis tunggal (api/penulis.py).
+    """
+    return tulis(_simpan_vote, voter.id, voter.admin_owner_id, kandidat_id)
+
+
+def _simpan_vote(voter_id, admin_owner_id, kandidat_id):
+    try:
+        with transaction.atomic():
+            # Di dalam transaksi tulis: kandidat yang dihapus setelah cek ini
+            # bentrok di FK saat insert dan dicek ulang di bawah.
+            kandidat = Kandidat.objects.only('id', 'admin_owner_id').filter(id=kandidat_id).first()
+            if kandidat is None:
+                return 'kandidat_tidak_ada'
+            if kandidat.admin_owner_id != admin_owner_id:
+                return 'bukan_kandidat_admin'
+            Vote.objects.create(voter_id=voter_id, kandidat=kandidat)
+            cek_voting_dibuka(admin_owner_id)
+    except VotingDitutup:
+        return 'voting_ditutup'
+    except IntegrityError:
+        if Vote.objects.filter(voter_id=voter_id).exists():
+            return 'sudah_vote'
+        if not Kandidat.objects.filter(id=kandidat_id).exists():
+            return 'kandidat_tidak_ada'
+        raise
+    return None
+
+
 # ========================
 # Auth / User Management
 # ========================
@@ -41,6 +199,7 @@ def register_admin(request):
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def me(request):
     """
@@ -54,6 +213,7 @@ def me(request):
 def change_password(request):
     """
     Peserta atau admin ganti password sendiri.
+    Semua token lama dibatalkan; response berisi pasangan token baru.
     """
     ser = ChangePasswordSerializer(data=request.data, context={'request': request.user})
     ser.is_valid(raise_exception=True)
@@ -61,8 +221,33 @@ def change_password(request):
     user.set_password(ser.validated_data['new_password'])
     if getattr(user, 'is_participant', False) and user.must_change_password:
         user.must_change_password = False
+    user.token_version += 1
     user.save()
-    return Response({"message": "Password updated"}, status=200)
+    return Response({"message": "Password updated", **token_baru(user)}, status=200)
+
+
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def ballot_login(request):
+    """
+    Login peserta dengan kode ballot sekali pakai. Verifikasi cukup HMAC + lookup
+    (tanpa PBKDF2), hasilnya access token berumur pendek yang hanya berlaku
+    untuk vote dan jalur baca (scope "vote"), tanpa alur ganti password.
+    Kode hangus setelah peserta vote: token kedaluwarsa sebelum vote cukup login ulang.
+    """
+    ser = BallotLoginSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+    kode = (BallotCode.objects.select_related('peserta')
+                .filter(digest=digest_kode(ser.validated_data['code'])).first())
+    if kode is None or not kode.peserta.is_active:
+        return Response({"error": "Kode tidak valid."}, status=401)
+    # used_at = login pertama (audit). Login ulang boleh selama belum vote; vote
+    # ganda tetap dicegah constraint unique_vote_per_voter.
+    if (not BallotCode.objects.filter(pk=kode.pk, used_at__isnull=True).update(used_at=timezone.now())
+            and Vote.objects.filter(voter_id=kode.peserta_id).exists()):
+        return Response({"error": "Kode sudah dipakai."}, status=401)
+    return Response({"access": token_ballot(kode.peserta)}, status=200)
 
 
 # ========================
@@ -73,68 +258,156 @@ def change_password(request):
 @permission_classes([IsAuthenticated, IsAppAdmin])
 def generate_peserta(request):
     """
-    Admin generate N peserta (username+password random) yang terikat pada admin ini.
+    Admin generate N peserta (username berurutan + password random) yang terikat pada admin ini.
+    mode=ballot_code: tanpa password, tiap peserta dapat kode login sekali pakai.
+    fmt=json (maks 500) atau fmt=csv / fmt=ndjson (streaming, sampai 100k).
     """
     ser = GeneratePesertaSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
     jumlah = ser.validated_data['jumlah']
     prefix = ser.validated_data.get('prefix') or 'peserta'
+    fmt = ser.validated_data['fmt']
+    mode = ser.validated_data['mode']
+    kolom = 'code' if mode == 'ballot_code' else 'password'
+
+    if fmt == 'json':
+        accounts = buat_peserta_massal(request.user, jumlah, prefix, mode=mode)
+        return Response({"accounts": [{"username": u, kolom: p} for u, p in accounts]}, status=201)
+    # dibuat per batch sambil di-stream (lihat buat_peserta_bertahap)
+    accounts = buat_peserta_bertahap(request.user, jumlah, prefix, mode=mode)
+    return _respon_stream(['username', kolom], accounts, fmt, f'peserta-{prefix}', status=201)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAppAdmin])
+def import_peserta(request):
+    """
+    Admin import daftar peserta sendiri (NIM, NIP, dst.) dari CSV dengan header
+    username[,password]. Kirim sebagai body Content-Type: text/csv, atau
+    multipart dengan field "file". Diproses baris demi baris per batch.
+    """
+    if request.content_type.startswith('text/csv'):
+        # Body dibaca langsung dari stream, tidak lewat request.data/request.body
+        sumber = request.stream or []
+    else:
+        sumber = request.FILES.get('file')
+        if sumber is None:
+            return Response({"error": "Kirim CSV sebagai body text/csv atau field file."}, status=400)
+    try:
+        hasil = impor_peserta_csv(request.user, sumber)
+    except (ValueError, UnicodeDecodeError) as e:
+        return Response({"error": str(e)}, status=400)
+    hasil["errors_truncated"] = hasil["error_count"] > len(hasil["errors"])
+    return Response(hasil, status=201 if hasil["created"] else 200)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAppAdmin])
+def ballot_batch(request):
+    """
+    Admin sync vote dari kiosk offline: {"ballots": [{"peserta", "kandidat_id", "waktu"}, ...],
+    "signature": HMAC batch}. Tiap ballot diterima/ditolak sendiri-sendiri (api/ballot.py).
+    """
+    ser = BallotBatchSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+    ballots = ser.validated_data['ballots']
+    try:
+        valid = tanda_tangan_valid(request.user.id, ballots, ser.validated_data['signature'])
+    except ImproperlyConfigured as e:
+        return Response({"error": str(e)}, status=503)
+    if not valid:
+        return Response({"error": "Tanda tangan batch tidak valid."}, status=403)
+    if hasil_final(request.user.id) is not None:
+        return Response({"error": "Voting sudah ditutup."}, status=403)
+    results = unggah_batch(request.user, ballots)
+    diterima = sum(r["status"] == "accepted" for r in results)
+    return Response({"accepted": diterima, "rejected": len(results) - diterima, "results": results},
+                    status=201 if diterima else 200)
+
+
+_CONTENT_TYPE = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
 
-    accounts = []
-    for _ in range(jumlah):
-        suffix = ''.join(random.choices(string.digits, k=5))
-        username = f"{prefix}{suffix}"
-        password = ''.join(random.choices(string.ascii_letters + string.digits, k=8))
-        u = User.objects.create_user(
-            username=username,
-            password=password,
-            is_app_admin=False,
-            is_participant=True,
-            admin_owner=request.user,
-            must_change_password=True
-        )
-        accounts.append({"username": username, "password": password})
+def _baris_stream(header, rows, fmt):
+    """
+    Baris (tuple sesuai header) jadi potongan CSV / NDJSON untuk StreamingHttpResponse.
+    """
+    if fmt == 'ndjson':
+        for row in rows:
+            yield json.dumps(dict(zip(header, row))) + "\n"
+        return
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % 1000 == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def _respon_stream(header, rows, fmt, nama_file, status=200):
+    response = StreamingHttpResponse(_baris_stream(header, rows, fmt), status=status, content_type=_CONTENT_TYPE[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{nama_file}.{fmt}"'
+    return response
 
-    return Response({"accounts": accounts}, status=201)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAppAdmin])
+def tutup_voting_view(request):
+    """
+    Admin menutup voting ruangnya: vote berikutnya ditolak, hasil final dihitung
+    sekali dan hasil/kandidat selanjutnya dilayani dari snapshot itu.
+    """
+    final = tutup_voting(request.user)
+    if final is None:
+        return Response({"error": "Voting sudah ditutup."}, status=409)
+    return Response({"ditutup_at": final.ditutup_at, "hasil": final.hasil}, status=201)
 
 
 # ========================
 # Peserta Views
 # ========================
 
+_FIELDS_PESERTA = ['id', 'username', 'must_change_password', 'date_joined', 'sudah_vote']
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAppAdmin])
 def list_peserta_admin(request):
     """
     Admin lihat peserta yang dia buat sendiri, dengan filter dan pagination.
+    Default ?page=N; untuk ruang besar pakai ?pagination=cursor (keyset, lihat KeysetPagination).
+    ?fields=username,sudah_vote untuk sparse fieldset.
     """
     status_vote_raw = request.query_params.get('sudah_vote', None)
-    
-    peserta_qs = User.objects.filter(is_participant=True, admin_owner=request.user)
+    fields = _fields_diminta(request, _FIELDS_PESERTA)
+
+    # Dibaca dari read replica kalau ada (kecuali admin ini baru saja menulis).
+    peserta_qs = User.objects.using(alias_baca(request)).filter(is_participant=True, admin_owner=request.user)
+    kolom = ['id', 'username', 'must_change_password', 'date_joined']
+    if status_vote_raw is not None or not fields or 'sudah_vote' in fields:
+        # Status vote dihitung di query halaman itu sendiri (EXISTS), bukan query per baris
+        peserta_qs = peserta_qs.annotate(sudah_vote=Exists(Vote.objects.filter(voter=OuterRef('pk'))))
+        kolom.append('sudah_vote')
 
     if status_vote_raw is not None:
         sudah_vote_bool = status_vote_raw.lower() == 'true'
-        peserta_qs = peserta_qs.annotate(
-            sudah_vote=Exists(Vote.objects.filter(voter=OuterRef('pk')))
-        ).filter(sudah_vote=sudah_vote_bool)
-    
-    peserta_qs = peserta_qs.order_by('date_joined')
+        peserta_qs = peserta_qs.filter(sudah_vote=sudah_vote_bool)
 
-    paginator = PageNumberPagination()
-    page_qs = paginator.paginate_queryset(peserta_qs, request)
-
-    # Membangun data secara manual (sesuai kode asli Anda)
-    data = []
-    for p in page_qs:
-        data.append({
-            "id": p.id,
-            "username": p.username,
-            "must_change_password": p.must_change_password,
-            "date_joined": localtime(p.date_joined).strftime("%Y-%m-%d %H:%M:%S"),
-            "sudah_vote": Vote.objects.filter(voter=p).exists(),
-        })
+    # values(): dict langsung dari cursor, tanpa instance User per baris
+    peserta_qs = peserta_qs.values(*kolom)
+    if request.query_params.get('pagination') == 'cursor' or 'cursor' in request.query_params:
+        paginator = KeysetPagination()
+    else:
+        peserta_qs = peserta_qs.order_by('date_joined', 'id')
+        paginator = PageNumberPagination()
+    page = paginator.paginate_queryset(peserta_qs, request)
 
-    return paginator.get_paginated_response(data)
+    data = [{**p, "date_joined": localtime(p["date_joined"]).strftime("%Y-%m-%d %H:%M:%S")} for p in page]
+    return paginator.get_paginated_response(pilih_fields(data, fields))
 
 
 # === VIEW BARU UNTUK FUNGSI HAPUS PESERTA (DELETE) ===
@@ -148,7 +421,7 @@ def peserta_detail_view(request, pk):
     peserta = get_object_or_404(User, pk=pk, is_participant=True, admin_owner=request.user)
     
     # Keamanan tambahan, meski query di atas sudah cukup
-    if peserta.admin_owner != request.user:
+    if peserta.admin_owner_id != request.user.id:
         return Response({"error": "Anda tidak punya izin untuk menghapus peserta ini."}, status=403)
     
     peserta.delete()
@@ -167,25 +440,44 @@ class KandidatViewSet(viewsets.ModelViewSet):
     queryset = Kandidat.objects.none()
     permission_classes = [AllowAny]
 
+    def get_authenticators(self):
+        # Baca daftar/detail kandidat cukup dari klaim JWT, tanpa query User
+        if self.request.method in SAFE_METHODS:
+            return [ClaimsJWTAuthentication()]
+        return super().get_authenticators()
+
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
             return KandidatListSerializer
         return KandidatCreateUpdateSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'retrieve':
+            context['fields'] = _fields_diminta(self.request, KandidatListSerializer.Meta.fields)
+        return context
+
     def get_queryset(self):
-        user = self.request.user
-        if user.is_authenticated and getattr(user, 'is_app_admin', False):
-            return Kandidat.objects.filter(admin_owner=user).annotate(total_votes=Count('votes')).order_by('-created_at')
-        if user.is_authenticated and getattr(user, 'is_participant', False):
-            return Kandidat.objects.filter(admin_owner=user.admin_owner).annotate(total_votes=Count('votes')).order_by('-created_at')
-        admin_username = self.request.query_params.get('admin')
-        if admin_username:
-            try:
-                admin_user = User.objects.get(username=admin_username, is_app_admin=True)
-            except User.DoesNotExist:
-                return Kandidat.objects.none()
-            return Kandidat.objects.filter(admin_owner=admin_user).annotate(total_votes=Count('votes')).order_by('-created_at')
-        return Kandidat.objects.none()
+        admin_id = getattr(self, '_admin_id', None)
+        if admin_id is None:
+            admin_id = _admin_id_dari_request(self.request)
+        if admin_id is None:
+            return Kandidat.objects.none()
+        qs = Kandidat.objects.filter(admin_owner_id=admin_id).order_by('-created_at')
+        if self.action in ['list', 'retrieve']:
+            qs = qs.annotate(total_votes=total_votes())
+        return qs
+
+    def list(self, request, *args, **kwargs):
+        with baca_replika(request):
+            self._admin_id = _admin_id_dari_request(request)
+            if self._admin_id is None:
+                return super().list(request, *args, **kwargs)
+            return _respon_versioned(
+                request, 'kandidat', self._admin_id,
+                lambda: _halaman_katalog(request, self._admin_id, self.paginator),
+                lambda final: _halaman_katalog(request, self._admin_id, self.paginator, final['kandidat']),
+            )
 
     def perform_create(self, serializer):
         if not (self.request.user.is_authenticated and self.request.user.is_app_admin):
@@ -212,51 +504,162 @@ class KandidatViewSet(viewsets.ModelViewSet):
 # ========================
 # Vote & Hasil
 # ========================
+@idempoten
 @api_view(['POST'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([IsAuthenticated, IsParticipant])
 def vote(request):
     """
     Peserta vote 1x.
+    Tidak ada pre-check "sudah vote": constraint unique_vote_per_voter yang
+    menjaga, jadi double-submit bersamaan tetap tercatat tepat satu kali.
+    Ulangan dengan header Idempotency-Key yang sama dijawab dari store (api/idempotency.py).
     """
     voter = request.user
-    if Vote.objects.filter(voter=voter).exists():
-        return Response({"error": "Anda sudah melakukan vote."}, status=400)
     ser = VoteCreateSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
-    kandidat_id = ser.validated_data['kandidat_id']
-    try:
-        kandidat = Kandidat.objects.get(id=kandidat_id)
-    except Kandidat.DoesNotExist:
-        return Response({"error": "Kandidat tidak ditemukan."}, status=404)
-    if kandidat.admin_owner_id != voter.admin_owner_id:
-        return Response({"error": "Anda tidak berhak memilih kandidat ini."}, status=403)
-    Vote.objects.create(voter=voter, kandidat=kandidat)
+    if alasan := _catat_vote(voter, ser.validated_data['kandidat_id']):
+        pesan, kode = PENOLAKAN_VOTE[alasan]
+        return Response({"error": pesan}, status=kode)
     return Response({"message": "Vote terekam."}, status=201)
 
 
 @api_view(['GET'])
+@authentication_classes([ClaimsJWTAuthentication])
 @permission_classes([AllowAny])
 def hasil(request):
     """
     Grafik hasil PER ADMIN.
     """
     user = request.user
-    qs = Kandidat.objects.none()
-    if user.is_authenticated and getattr(user, 'is_app_admin', False):
-        qs = Kandidat.objects.filter(admin_owner=user)
-    elif user.is_authenticated and getattr(user, 'is_participant', False):
-        qs = Kandidat.objects.filter(admin_owner=user.admin_owner)
-    else:
-        admin_username = request.query_params.get('admin')
-        if not admin_username:
-            return Response({"error": "Parameter ?admin=USERNAME wajib untuk akses publik."}, status=400)
-        try:
-            admin_user = User.objects.get(username=admin_username, is_app_admin=True)
-        except User.DoesNotExist:
+    punya_ruang = getattr(user, 'is_app_admin', False) or getattr(user, 'is_participant', False)
+    if not punya_ruang and not request.query_params.get('admin'):
+        return Response({"error": "Parameter ?admin=USERNAME wajib untuk akses publik."}, status=400)
+    with baca_replika(request):
+        admin_id = _admin_id_dari_request(request)
+        if admin_id is None:
             return Response([], status=200)
-        qs = Kandidat.objects.filter(admin_owner=admin_user)
+        return _respon_versioned(request, 'hasil', admin_id, lambda: hitung_hasil(admin_id), lambda final: final['hasil'])
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAppAdmin])
+def turnout(request):
+    """
+    Statistik turnout ruang admin: total peserta, sudah/belum vote, persentase,
+    dan jumlah vote per menit (?sejak=ISO 8601 untuk membatasi deret). Dibaca
+    dari agregat inkremental (api/turnout.py), bukan scan peserta/vote.
+    """
+    sejak = request.query_params.get('sejak')
+    if sejak:
+        try:
+            sejak = parse_datetime(sejak)
+        except ValueError:
+            sejak = None
+        if sejak is None:
+            return Response({"error": "Parameter sejak harus waktu ISO 8601."}, status=400)
+        if timezone.is_naive(sejak):
+            sejak = timezone.make_aware(sejak)
+    return Response(statistik_turnout(request.user.id, sejak or None, using=alias_baca(request)))
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
-    data = (qs.annotate(total=Count('votes'))
-              .values('nama', 'total')
-              .order_by('-total', 'nama'))
-    return Response([{"kandidat": r["nama"], "total": r["total"]} for r in data], status=200)
\ No newline at end of file
+async def _stream_hasil(admin_id):
+    queue = broadcaster.subscribe(admin_id)
+    try:
+        while True:
+            try:
+                snapshot = await asyncio.wait_for(queue.get(), timeout=settings.HASIL_STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _sse("hasil", snapshot)
+    finally:
+        broadcaster.unsubscribe(admin_id, queue)
+
+
+@require_GET
+async def hasil_stream(request):
+    """
+    Live hasil PER ADMIN via Server-Sent Events: ?admin=USERNAME.
+    Push hanya saat hasil berubah; butuh server ASGI (lihat voting_project/asgi.py).
+    """
+    if isinstance(request, WSGIRequest):
+        # Di WSGI stream async akan di-buffer penuh; client pakai polling /api/hasil/.
+        return JsonResponse({"error": "Live stream butuh server ASGI, gunakan /api/hasil/."}, status=503)
+    admin_username = request.GET.get('admin')
+    if not admin_username:
+        return JsonResponse({"error": "Parameter ?admin=USERNAME wajib."}, status=400)
+    admin_id = await sync_to_async(admin_id_untuk)(admin_username)
+    if admin_id is None:
+        return JsonResponse({"error": "Admin tidak ditemukan."}, status=404)
+
+    response = StreamingHttpResponse(_stream_hasil(admin_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ========================
+# Export (audit)
+# ========================
+
+def _fmt_export(request):
+    fmt = request.query_params.get('fmt', 'csv')
+    # bukan ?format=, yang sudah dipakai DRF untuk memilih renderer
+    return fmt if fmt in _CONTENT_TYPE else None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAppAdmin])
+def export_votes(request):
+    """
+    Semua vote di ruang admin ini (username peserta, kandidat, waktu), urut id.
+    Dibaca lewat iterator() (server-side cursor di PostgreSQL) dan dialirkan
+    per potongan, jadi memori tetap berapapun jumlah vote. ?fmt=csv|ndjson.
+    """
+    fmt = _fmt_export(request)
+    if fmt is None:
+        return Response({"error": "fmt harus csv atau ndjson."}, status=400)
+    rows = (Vote.objects.using(alias_baca(request))
+                .filter(kandidat__admin_owner=request.user)
+                .order_by('id')
+                .values_list('voter__username', 'kandidat__nama', 'created_at')
+                .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE))
+    baris = ((username, nama, localtime(waktu).isoformat()) for username, nama, waktu in rows)
+    return _respon_stream(['voter', 'kandidat', 'created_at'], baris, fmt, f'votes-{request.user.username}')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAppAdmin])
+def export_hasil(request):
+    """
+    Total suara per kandidat (dari tally) dalam format yang sama dengan export_votes.
+    """
+    fmt = _fmt_export(request)
+    if fmt is None:
+        return Response({"error": "fmt harus csv atau ndjson."}, status=400)
+    rows = (Kandidat.objects.using(alias_baca(request))
+                .filter(admin_owner=request.user)
+                .annotate(total=total_votes())
+                .order_by('-total', 'nama')
+                .values_list('id', 'nama', 'total')
+                .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE))
+    return _respon_stream(['kandidat_id', 'kandidat', 'total'], rows, fmt, f'hasil-{request.user.username}')
+
+
+# ========================
+# Monitoring
+# ========================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def metrics(request):
+    """
+    Metrik per view (format teks Prometheus), gabungan semua worker. Hanya staff Django.
+    """
+    return HttpResponse(render_prometheus(metrics_store.agregat()),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
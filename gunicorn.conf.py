@@ -0,0 +1,12 @@
+"""
+Konfigurasi gunicorn (dibaca otomatis dari folder kerja).
+"""
+import os
+
+
+def child_exit(server, worker):
+    # metrik worker yang keluar dilebur ke arsip (api/metrics.py), file per-pid tidak menumpuk
+    folder = os.environ.get('METRICS_DIR')
+    if folder:
+        from api.metrics import tandai_proses_mati
+        tandai_proses_mati(worker.pid, folder)
@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Live hasil (/api/hasil/stream/) hanya jalan di server ASGI, misalnya:
+    uvicorn voting_project.asgi:application
+    gunicorn voting_project.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
 import os
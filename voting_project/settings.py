@@ -35,7 +35,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Metrik per view untuk /api/metrics/; dilepas otomatis kalau METRICS_ENABLED=False
+    'api.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    # Rate limit / admission control sebelum view menyentuh DB (api/admission.py);
+    # setelah CORS supaya browser bisa membaca 429 + Retry-After
+    'api.admission.AdmissionMiddleware',
+    # Read-your-writes untuk read replica; dilepas otomatis kalau tidak ada replica
+    'api.replica.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     # ## PERBAIKAN 2: Tambahkan Whitenoise Middleware di sini ##
     # Ini penting agar Render bisa menyajikan file statis (CSS/JS admin) dengan benar.
@@ -73,6 +80,49 @@ DATABASES = {
         conn_max_age=600
     )
 }
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Test konkurensi memakai banyak thread; SQLite in-memory (shared cache)
+    # langsung gagal "table is locked", jadi database test dibuat sebagai file.
+    DATABASES['default']['TEST'] = {'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3')}
+
+# Mode produksi SQLite (SQLITE_WAL=True; mati untuk dev & test): WAL (pembaca
+# tidak memblokir penulis), fsync per checkpoint saja, dan penulis yang bentrok
+# menunggu (busy_timeout) alih-alih langsung "database is locked". IMMEDIATE:
+# transaksi mengambil lock tulis di awal, jadi tidak ada upgrade lock di tengah
+# yang melewati busy_timeout. Test konkurensi memasangnya sendiri (api/tests.py).
+SQLITE_WAL = os.environ.get('SQLITE_WAL', 'False') == 'True'
+SQLITE_OPTIONS_PRODUKSI = {
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        f"PRAGMA synchronous={os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')};"
+        f"PRAGMA busy_timeout={int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))};"
+    ),
+    'transaction_mode': 'IMMEDIATE',
+}
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3' and SQLITE_WAL:
+    DATABASES['default']['OPTIONS'] = dict(SQLITE_OPTIONS_PRODUKSI)
+
+# Antrian tulis tunggal (api/penulis.py): vote & generate peserta ditulis oleh satu
+# thread per proses dalam batch (satu transaksi/commit per batch). Untuk SQLite;
+# BATCH: maksimum operasi per transaksi, WAIT_MS: jeda mengumpulkan batch.
+SQLITE_WRITE_QUEUE = os.environ.get('SQLITE_WRITE_QUEUE', 'False') == 'True'
+SQLITE_WRITE_BATCH = int(os.environ.get('SQLITE_WRITE_BATCH', '200'))
+SQLITE_WRITE_WAIT_MS = float(os.environ.get('SQLITE_WRITE_WAIT_MS', '2'))
+
+# Read replica (api/replica.py), dipisah koma. Contoh lokal dengan dua file SQLite:
+#   cp db.sqlite3 replica.sqlite3 && DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3
+# Hanya hasil, daftar kandidat/peserta dan export yang membaca dari replica.
+DATABASE_REPLICAS = []
+for i, url in enumerate(u.strip() for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()):
+    alias = f'replica{i + 1}'
+    DATABASES[alias] = dj_database_url.parse(url, conn_max_age=600)
+    # Saat test, replica = koneksi ke database test default
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['api.replica.ReplicaRouter']
+# Lama principal yang baru menulis dibaca dari primary, dan batas umur cache hasil
+# yang dihitung dari replica (kira-kira lag replikasi maksimum), dalam detik
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', '10'))
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -98,7 +148,12 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.VersionedJWTAuthentication',
+    ),
+    # JSON via orjson kalau terpasang (opsional, api/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10
@@ -106,8 +161,129 @@ REST_FRAMEWORK = {
 
 AUTH_USER_MODEL = "api.User"
 
+# Cache: LocMem per proses secara default. Untuk beberapa worker gunicorn set
+# REDIS_URL (butuh package `redis`) supaya versi hasil terbagi antar worker.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'voting'}}
+
+# Cache response hasil & daftar kandidat per "versi hasil" admin (ETag/304).
+# Tanpa cache bersama, timeout pendek membatasi data basi di worker lain.
+HASIL_CACHE_ALIAS = 'default'
+HASIL_CACHE_TIMEOUT = int(os.environ.get('HASIL_CACHE_TIMEOUT', '300' if REDIS_URL else '5'))
+
+# Jumlah shard tally per kandidat (api/tally.py). Makin banyak, makin sedikit
+# vote bersamaan yang berebut row lock yang sama; hasil menjumlah semua shard.
+VOTE_TALLY_SHARDS = int(os.environ.get('VOTE_TALLY_SHARDS', '8'))
+
+# max-age (detik) hasil & kandidat dari snapshot final setelah admin menutup voting
+HASIL_FINAL_MAX_AGE = int(os.environ.get('HASIL_FINAL_MAX_AGE', str(24 * 3600)))
+
+# Cache hitungan total untuk ?count=approx di keyset pagination (detik)
+KEYSET_APPROX_COUNT_TIMEOUT = int(os.environ.get('KEYSET_APPROX_COUNT_TIMEOUT', '60'))
+
+# Generate peserta massal (api/peserta.py): ukuran batch bulk_create, jumlah
+# proses untuk hashing password (minimal PESERTA_HASH_POOL_MIN akun baru pakai pool),
+# dan hasher untuk password awal peserta (nama algoritma dari PASSWORD_HASHERS).
+PESERTA_BATCH_SIZE = int(os.environ.get('PESERTA_BATCH_SIZE', '1000'))
+PESERTA_HASH_WORKERS = int(os.environ.get('PESERTA_HASH_WORKERS', os.cpu_count() or 1))
+PESERTA_HASH_POOL_MIN = 64
+PESERTA_PASSWORD_HASHER = os.environ.get('PESERTA_PASSWORD_HASHER', 'default')
+
+# Export vote/hasil (/api/export/...): jumlah baris per fetch dari server-side cursor
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', '2000'))
+
+# Cache katalog kandidat & username admin -> id untuk akses publik (api/cache.py):
+# LRU in-process (ukuran & TTL) di depan cache bersama KATALOG_CACHE_ALIAS (None = LRU saja).
+# Tanpa Redis, LocMem tiap worker bukan cache bersama: invalidasi dari signal hanya
+# sampai ke worker yang menulis, jadi cukup LRU (basi paling lama KATALOG_LRU_TTL).
+KATALOG_CACHE_ALIAS = 'default' if REDIS_URL else None
+KATALOG_CACHE_TIMEOUT = 3600
+KATALOG_LRU_SIZE = int(os.environ.get('KATALOG_LRU_SIZE', '1024'))
+KATALOG_LRU_TTL = float(os.environ.get('KATALOG_LRU_TTL', '30'))
+
+# Cache versi token JWT per user (pembatalan token untuk ClaimsJWTAuthentication).
+# Tanpa cache bersama, token yang dibatalkan di worker lain paling lama berlaku selama timeout ini.
+TOKEN_VERSION_CACHE_TIMEOUT = int(os.environ.get('TOKEN_VERSION_CACHE_TIMEOUT', '300' if REDIS_URL else '30'))
+
+# Metrik latency/query per view (api/metrics.py). METRICS_DIR: folder bersama
+# semua worker gunicorn; tanpa itu metrik hanya dari proses yang melayani /api/metrics/.
+# File worker yang mati dilebur ke arsip (hook child_exit di gunicorn.conf.py + saat scrape).
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'False') == 'True'
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', '5'))
+
+# Admission control (api/admission.py). RATE_LIMITS: nama route -> {principal: (burst, per detik)},
+# '*' untuk route lain; principal = peserta / admin / anon (per IP klien).
+# TRUSTED_PROXIES: IP/CIDR reverse proxy / load balancer (koma); request dari sana
+# diambil IP kliennya dari X-Forwarded-For. Kosong = pakai REMOTE_ADDR apa adanya,
+# jadi di belakang proxy tanpa setting ini semua anon berbagi satu bucket.
+# LOGIN_ANON: jatah login anon per IP. Satu NAT kampus/sekolah = satu IP untuk
+# ratusan peserta yang login bersamaan saat voting dibuka, jadi default longgar;
+# bucket GLOBAL tetap membatasi beban total.
+# GLOBAL: kapasitas request per proses; route non-PRIORITAS ditolak saat sisa < CADANGAN * burst.
+# ADMISSION_CACHE_ALIAS: bucket per principal di cache bersama (None = per proses).
+ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'False') == 'True'
+ADMISSION_CACHE_ALIAS = 'default' if REDIS_URL else None
+ADMISSION_MAX_KEYS = 100_000
+ADMISSION_TRUSTED_PROXIES = [x.strip() for x in os.environ.get('ADMISSION_TRUSTED_PROXIES', '').split(',') if x.strip()]
+ADMISSION_LOGIN_ANON = (
+    int(os.environ.get('ADMISSION_LOGIN_ANON_BURST', '200')),
+    float(os.environ.get('ADMISSION_LOGIN_ANON_RATE', '20')),
+)
+ADMISSION_RATE_LIMITS = {
+    'vote': {'peserta': (5, 1)},
+    'token_obtain_pair': {'anon': ADMISSION_LOGIN_ANON},
+    'token_ballot': {'anon': ADMISSION_LOGIN_ANON},
+    'hasil': {'peserta': (5, 1), 'admin': (10, 2), 'anon': (10, 2)},
+    'kandidat-list': {'peserta': (5, 1), 'admin': (10, 2), 'anon': (10, 2)},
+    '*': {'peserta': (20, 5), 'admin': (60, 20), 'anon': (30, 10)},
+}
+ADMISSION_GLOBAL = (
+    int(os.environ.get('ADMISSION_GLOBAL_BURST', '200')),
+    float(os.environ.get('ADMISSION_GLOBAL_RATE', '100')),
+)
+ADMISSION_PRIORITAS = {'vote', 'token_ballot'}
+ADMISSION_CADANGAN = 0.3
+
+# Idempotency-Key untuk POST vote (api/idempotency.py): hasil pertama disimpan
+# IDEMPOTENCY_TTL detik di LRU per proses (maks IDEMPOTENCY_MAX_KEYS key) di depan
+# cache bersama IDEMPOTENCY_CACHE_ALIAS (None = per proses saja).
+IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', '600'))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get('IDEMPOTENCY_MAX_KEYS', '100000'))
+IDEMPOTENCY_CACHE_ALIAS = 'default' if REDIS_URL else None
+
+# Live stream hasil via Server-Sent Events (/api/hasil/stream/, butuh server ASGI).
+# INTERVAL: jarak minimal antar push per admin; POLL: cek ulang berkala untuk
+# vote yang tercatat di worker lain; KEEPALIVE: komentar SSE agar koneksi tidak diputus proxy.
+HASIL_STREAM_INTERVAL = float(os.environ.get('HASIL_STREAM_INTERVAL', '1'))
+HASIL_STREAM_POLL = float(os.environ.get('HASIL_STREAM_POLL', '5'))
+HASIL_STREAM_KEEPALIVE = float(os.environ.get('HASIL_STREAM_KEEPALIVE', '15'))
+
 from datetime import timedelta
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=6),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
-}
\ No newline at end of file
+    # Role & admin_owner_id sebagai klaim JWT (api/authentication.py)
+    "TOKEN_OBTAIN_SERIALIZER": "api.serializers.VotingTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "api.serializers.VotingTokenRefreshSerializer",
+}
+
+# Login kode ballot (/api/token/ballot/): kunci HMAC kode dan umur token scope "vote"
+BALLOT_CODE_SECRET = os.environ.get('BALLOT_CODE_SECRET', SECRET_KEY)
+BALLOT_TOKEN_LIFETIME = timedelta(minutes=int(os.environ.get('BALLOT_TOKEN_MINUTES', '30')))
+
+# Upload batch vote dari kiosk offline (/api/ballot-batch/): rahasia induk kunci HMAC
+# kiosk per admin (WAJIB terpisah dari SECRET_KEY, tanpa fallback; kosong = endpoint
+# menjawab 503), maksimal ballot per request, ukuran chunk insert, dan toleransi jam kiosk.
+BALLOT_BATCH_SECRET = os.environ.get('BALLOT_BATCH_SECRET', '')
+BALLOT_BATCH_MAX = int(os.environ.get('BALLOT_BATCH_MAX', '10000'))
+BALLOT_BATCH_CHUNK = int(os.environ.get('BALLOT_BATCH_CHUNK', '1000'))
+BALLOT_BATCH_SKEW = timedelta(minutes=5)
+
+# Django admin untuk tabel besar (api/admin.py): changelist menghitung maksimal
+# ADMIN_COUNT_MAKS baris (tanpa filter: estimasi), filter admin maksimal ADMIN_FILTER_MAKS pilihan.
+ADMIN_COUNT_MAKS = int(os.environ.get('ADMIN_COUNT_MAKS', '10000'))
+ADMIN_FILTER_MAKS = 50